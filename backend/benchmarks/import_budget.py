@@ -0,0 +1,85 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_BUDGET_SECONDS = 1.5
+ROLES = ["all", "api", "worker"]
+# Only the code paths that use these may import them; loading one while importing the app is a regression.
+HEAVY_MODULES = ["torch", "easyocr", "spacy", "sklearn", "scipy", "pandas", "joblib", "fitz", "pymupdf", "openai"]
+
+PROBE = (
+    "import sys, time\n"
+    "started = time.perf_counter()\n"
+    "import backend.main\n"
+    "elapsed = time.perf_counter() - started\n"
+    f"print(elapsed, ','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules) or '-')"
+)
+
+
+def _run_probe(role: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    command = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", PROBE]
+    return subprocess.run(
+        command,
+        cwd=REPO_ROOT,
+        env={**os.environ, "NODE_ROLE": role},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def measure(role: str, iterations: int) -> Tuple[float, List[str]]:
+    seconds = []
+    heavy: List[str] = []
+    for _ in range(iterations):
+        elapsed, loaded = _run_probe(role).stdout.split()[-2:]
+        seconds.append(float(elapsed))
+        heavy = [] if loaded == "-" else loaded.split(",")
+    return statistics.median(seconds), heavy
+
+
+def slowest_packages(role: str, limit: int = 10) -> List[Tuple[str, float]]:
+    # -X importtime lines look like "import time: self_us | cumulative_us | <indent>module".
+    cumulative: Dict[str, float] = {}
+    for line in _run_probe(role, importtime=True).stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line.split("|", 2)
+        name = name.strip()
+        if "." not in name and total.strip().isdigit():
+            cumulative[name] = max(cumulative.get(name, 0.0), int(total) / 1e6)
+    return sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fail when importing the app gets slow or loads heavy dependencies.")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS, help="Max median import seconds.")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--roles", nargs="+", choices=ROLES, default=ROLES)
+    args = parser.parse_args()
+
+    failures = []
+    for role in args.roles:
+        seconds, heavy = measure(role, args.iterations)
+        print(f"NODE_ROLE={role}: import backend.main {seconds:.3f}s (budget {args.budget:.3f}s)")
+        if heavy:
+            failures.append(f"NODE_ROLE={role} imported {', '.join(heavy)} at startup")
+        if seconds > args.budget:
+            failures.append(f"NODE_ROLE={role} import took {seconds:.3f}s, over the {args.budget:.3f}s budget")
+            for name, package_seconds in slowest_packages(role):
+                print(f"  {name}: {package_seconds:.3f}s", file=sys.stderr)
+
+    for failure in failures:
+        print(f"BUDGET {failure}", file=sys.stderr)
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
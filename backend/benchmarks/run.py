@@ -0,0 +1,325 @@
+import argparse
+import difflib
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from .synthetic import (
+    ocr_noise,
+    photo_image,
+    report_image,
+    report_labs,
+    report_text,
+    scanned_pdf,
+    symptom_strings,
+    text_pdf,
+)
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+STAGES = ["cold_start", "ocr", "ocr_preprocess", "nlp", "lab_values", "prediction", "api"]
+Metrics = Dict[str, float]
+
+
+def _time_calls(fn: Callable[[], Any], iterations: int, warmup: int = 1) -> List[float]:
+    for _ in range(warmup):
+        fn()
+    durations = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def _summarize(prefix: str, durations: List[float], items_per_call: int = 1) -> Metrics:
+    ordered = sorted(durations)
+    p95_index = min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))
+    return {
+        f"{prefix}.p50_ms": statistics.median(ordered) * 1000,
+        f"{prefix}.p95_ms": ordered[p95_index] * 1000,
+        f"{prefix}.mean_ms": statistics.fmean(ordered) * 1000,
+        f"{prefix}.items_per_second": items_per_call * len(ordered) / sum(ordered),
+    }
+
+
+def _peak_memory_mb(fn: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / (1024 * 1024)
+
+
+def _measure(prefix: str, fn: Callable[[], Any], iterations: int, items_per_call: int = 1) -> Metrics:
+    metrics = _summarize(prefix, _time_calls(fn, iterations), items_per_call)
+    metrics[f"{prefix}.peak_mb"] = _peak_memory_mb(fn)
+    return metrics
+
+
+def bench_cold_start(iterations: int) -> Metrics:
+    snippets = {
+        "import_api": "import backend.main",
+        "predictor": "from backend.ml.predictor import Predictor; Predictor()",
+        "interpreter": "from backend.nlp.interpret_text import get_interpreter; get_interpreter().warm()",
+        "ocr_reader": "from backend.ocr.extract_text import _get_reader; _get_reader()",
+    }
+    metrics: Metrics = {}
+    for name, snippet in snippets.items():
+        code = (
+            "import resource, time\n"
+            "started = time.perf_counter()\n"
+            f"{snippet}\n"
+            "print(time.perf_counter() - started, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+        )
+        seconds, rss = [], []
+        for _ in range(iterations):
+            output = subprocess.run(
+                [sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+            ).stdout.split()
+            seconds.append(float(output[-2]))
+            rss.append(int(output[-1]) / 1024)
+        metrics[f"cold_start.{name}.seconds"] = statistics.median(seconds)
+        metrics[f"cold_start.{name}.rss_mb"] = statistics.median(rss)
+    return metrics
+
+
+def bench_ocr(iterations: int) -> Metrics:
+    from ..ocr.extract_text import extract_text_from_file
+
+    samples = {
+        "text_pdf_3p": (text_pdf(3), "application/pdf"),
+        "scanned_pdf_1p": (scanned_pdf(1), "application/pdf"),
+        "png": (report_image("PNG"), "image/png"),
+        "jpeg": (report_image("JPEG"), "image/jpeg"),
+    }
+    metrics: Metrics = {}
+    for name, (data, content_type) in samples.items():
+        metrics.update(_measure(f"ocr.{name}", lambda: extract_text_from_file(data, content_type), iterations))
+    return metrics
+
+
+def bench_ocr_preprocess(iterations: int) -> Metrics:
+    import numpy as np
+    from PIL import Image
+
+    from ..ocr.extract_text import _perform_ocr
+    from ..ocr.preprocess import PreprocessConfig, get_preprocess_config, preprocess_image
+
+    samples = {
+        "photo_300dpi": (photo_image(seed=7), "image/jpeg", report_text(7)),
+        "scan_200dpi": (report_image("PNG", seed=8, dpi=200), "image/png", report_text(8)),
+    }
+    metrics: Metrics = {}
+    for name, (data, content_type, truth) in samples.items():
+        with Image.open(io.BytesIO(data)) as image:
+            array = np.asarray(image.convert("RGB"))
+        variants = {"raw": PreprocessConfig(enabled=False), "preprocessed": get_preprocess_config(content_type)}
+        for variant, config in variants.items():
+            prefix = f"ocr_preprocess.{name}.{variant}"
+            metrics.update(_summarize(prefix, _time_calls(lambda: _perform_ocr(array, config), iterations)))
+            text = _perform_ocr(array, config)
+            # EasyOCR cost tracks the pixels it is handed.
+            prepared = preprocess_image(array, config)
+            metrics[f"{prefix}.megapixels"] = prepared.shape[0] * prepared.shape[1] / 1e6
+            metrics[f"{prefix}.truth_similarity"] = difflib.SequenceMatcher(None, truth, text).ratio()
+    return metrics
+
+
+def bench_nlp(iterations: int) -> Metrics:
+    from ..nlp.interpret_text import get_interpreter
+
+    interpreter = get_interpreter()
+    texts = [report_text(seed) for seed in range(64)]
+    long_text = "\n".join(texts * 20)
+    metrics: Metrics = {}
+    metrics.update(_measure("nlp.analyze", lambda: interpreter.analyze(texts[0]), iterations))
+    metrics.update(_measure("nlp.analyze_many_64", lambda: interpreter.analyze_many(texts), iterations, len(texts)))
+    metrics.update(_measure("nlp.analyze_long", lambda: interpreter.analyze(long_text), max(1, iterations // 4)))
+    return metrics
+
+
+def bench_lab_values(iterations: int) -> Metrics:
+    from ..nlp.lab_values import get_lab_extractor
+
+    extractor = get_lab_extractor()
+    seeds = range(256)
+    clean = [report_text(seed) for seed in seeds]
+    samples = {"clean": clean, "ocr_noise": [ocr_noise(text, seed) for seed, text in zip(seeds, clean)]}
+    long_text = "\n".join(clean)
+    metrics: Metrics = {}
+    metrics.update(
+        _measure("lab_values.reports_256", lambda: [extractor.extract(text) for text in clean], iterations, len(clean))
+    )
+    # Items are characters here, so items_per_second reads as scan throughput.
+    metrics.update(_measure("lab_values.long_text_chars", lambda: extractor.extract(long_text), iterations, len(long_text)))
+    for name, texts in samples.items():
+        expected = found = 0
+        for seed, text in zip(seeds, texts):
+            extracted = {(value.analyte, value.value) for value in extractor.extract(text)}
+            truth = {(analyte, value) for analyte, value, _ in report_labs(seed)}
+            expected += len(truth)
+            found += len(truth & extracted)
+        metrics[f"lab_values.{name}.recall"] = found / expected
+    return metrics
+
+
+def bench_prediction(iterations: int) -> Metrics:
+    from ..ml.predictor import get_predictor
+
+    predictor = get_predictor()
+    symptoms = symptom_strings(256)
+    metrics: Metrics = {}
+    metrics.update(_measure("prediction.single", lambda: predictor.predict_from_symptoms(symptoms[0]), iterations))
+    metrics.update(_measure("prediction.batch_256", lambda: predictor.predict_batch(symptoms), iterations, len(symptoms)))
+    return metrics
+
+
+def bench_api(iterations: int) -> Metrics:
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError as exc:
+        raise SystemExit("The api stage needs mongomock-motor: pip install mongomock-motor") from exc
+    from fastapi.testclient import TestClient
+
+    from .. import database, main
+
+    async def connect_to_mock() -> None:
+        database.client = AsyncMongoMockClient()
+        database.database = database.client["benchmark"]
+
+    main.connect_to_mongo = connect_to_mock
+    metrics: Metrics = {}
+    with TestClient(main.app) as client:
+        deadline = time.perf_counter() + 600
+        while client.get("/ready").status_code != 200:
+            if time.perf_counter() > deadline:
+                raise SystemExit("API never became ready.")
+            time.sleep(0.2)
+
+        credentials = {"email": "bench@example.com", "password": "benchmark-password"}
+        client.post("/api/auth/register", json=credentials)
+        form = {"username": credentials["email"], "password": credentials["password"]}
+        metrics.update(_summarize("api.login", _time_calls(lambda: client.post("/api/auth/login", data=form), iterations)))
+        token = client.post("/api/auth/login", data=form).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        symptoms = symptom_strings(iterations + 1)
+        calls = iter(symptoms)
+        metrics.update(_summarize(
+            "api.symptoms",
+            _time_calls(lambda: client.post("/api/symptoms/", json={"symptoms": next(calls)}, headers=headers), iterations),
+        ))
+
+        # A fresh document per call keeps the result cache out of the pipeline numbers.
+        uploads = {
+            "text_pdf": (lambda seed: text_pdf(2, seed), "application/pdf", "report.pdf"),
+            "scanned_pdf": (lambda seed: scanned_pdf(1, seed), "application/pdf", "scan.pdf"),
+            "png": (lambda seed: report_image("PNG", seed), "image/png", "photo.png"),
+        }
+        for name, (make, content_type, filename) in uploads.items():
+            seeds = iter(range(1000, 1000 + iterations + 1))
+
+            def upload() -> None:
+                response = client.post(
+                    "/api/reports/upload",
+                    files={"report_file": (filename, make(next(seeds)), content_type)},
+                    headers=headers,
+                )
+                response.raise_for_status()
+
+            metrics.update(_summarize(f"api.upload_{name}", _time_calls(upload, iterations)))
+
+        cached = text_pdf(2, 1000)
+        metrics.update(_summarize(
+            "api.upload_cached",
+            _time_calls(
+                lambda: client.post(
+                    "/api/reports/upload",
+                    files={"report_file": ("report.pdf", cached, "application/pdf")},
+                    headers=headers,
+                ),
+                iterations,
+            ),
+        ))
+        metrics.update(_summarize(
+            "api.list_reports", _time_calls(lambda: client.get("/api/reports/", headers=headers), iterations)
+        ))
+    return metrics
+
+
+BENCHMARKS: Dict[str, Callable[[int], Metrics]] = {
+    "cold_start": bench_cold_start,
+    "ocr": bench_ocr,
+    "ocr_preprocess": bench_ocr_preprocess,
+    "nlp": bench_nlp,
+    "lab_values": bench_lab_values,
+    "prediction": bench_prediction,
+    "api": bench_api,
+}
+
+
+def compare(metrics: Metrics, baseline: Metrics, tolerance: float) -> List[str]:
+    regressions = []
+    for key, value in metrics.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        change = (value - previous) / previous
+        higher_is_better = key.endswith(("per_second", "similarity", "recall"))
+        if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+            regressions.append(f"{key}: {previous:.3f} -> {value:.3f} ({change:+.0%})")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the OCR, NLP, prediction and API pipelines.")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--output", type=Path, default=Path("benchmark_results.json"))
+    parser.add_argument("--baseline", type=Path, help="Earlier results JSON to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown before failing.")
+    args = parser.parse_args()
+
+    metrics: Metrics = {}
+    for stage in args.stages:
+        started = time.perf_counter()
+        metrics.update(BENCHMARKS[stage](args.iterations))
+        print(f"{stage}: done in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "stages": args.stages,
+        },
+        "metrics": {key: round(value, 4) for key, value in sorted(metrics.items())},
+    }
+    regressions: List[str] = []
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())["metrics"]
+        regressions = compare(results["metrics"], baseline, args.tolerance)
+        results["regressions"] = regressions
+
+    args.output.write_text(json.dumps(results, indent=2))
+    print(json.dumps(results["metrics"], indent=2))
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    if regressions:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import io
+import random
+from typing import List, Tuple
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+
+LAB_PANEL = [
+    ("Glucose", "mg/dL", (70, 99)),
+    ("Hemoglobin", "g/dL", (13.5, 17.5)),
+    ("Hematocrit", "%", (38.8, 50.0)),
+    ("White Blood Cells", "10^3/uL", (4.5, 11.0)),
+    ("Platelets", "10^3/uL", (150, 450)),
+    ("Total Cholesterol", "mg/dL", (125, 200)),
+    ("LDL Cholesterol", "mg/dL", (0, 100)),
+    ("HDL Cholesterol", "mg/dL", (40, 60)),
+    ("Triglycerides", "mg/dL", (0, 150)),
+    ("Creatinine", "mg/dL", (0.7, 1.3)),
+    ("Sodium", "mmol/L", (135, 145)),
+    ("Potassium", "mmol/L", (3.5, 5.1)),
+    ("TSH", "mIU/L", (0.4, 4.0)),
+    ("HbA1c", "%", (4.0, 5.6)),
+]
+SYMPTOMS = [
+    "fatigue", "headache", "dizziness", "chest pain", "shortness of breath", "frequent urination",
+    "excessive thirst", "blurred vision", "nausea", "fever", "cough", "joint pain", "pale skin",
+    "palpitations", "weight loss", "night sweats", "swollen ankles", "numbness in feet",
+]
+NOTES = [
+    "Patient reports intermittent fatigue over the past month.",
+    "Blood pressure measured at 142/91 mmHg during the visit.",
+    "No known drug allergies.",
+    "Follow-up recommended in six weeks with repeat fasting labs.",
+    "Family history of type 2 diabetes and hypertension.",
+]
+
+OCR_CONFUSIONS = {"0": "Oo", "1": "lI", "l": "1I", "o": "0", "O": "0"}
+
+
+def report_text(seed: int, lab_lines: int = 12) -> str:
+    return _report(seed, lab_lines)[0]
+
+
+def report_labs(seed: int, lab_lines: int = 12) -> List[Tuple[str, float, str]]:
+    # The (analyte, value, unit) rows printed by report_text for the same seed.
+    return _report(seed, lab_lines)[1]
+
+
+def _report(seed: int, lab_lines: int) -> Tuple[str, List[Tuple[str, float, str]]]:
+    rng = random.Random(seed)
+    lines = [f"Laboratory Report #{seed}", f"Patient ID: P{rng.randint(10000, 99999)}", ""]
+    labs = []
+    for analyte, unit, (low, high) in rng.sample(LAB_PANEL, k=min(lab_lines, len(LAB_PANEL))):
+        value = round(rng.uniform(low * 0.7, high * 1.4), 1)
+        lines.append(f"{analyte}: {value} {unit} (ref {low}-{high})")
+        labs.append((analyte, value, unit))
+    lines.append("")
+    lines.extend(rng.sample(NOTES, k=3))
+    return "\n".join(lines), labs
+
+
+def ocr_noise(text: str, seed: int = 0, rate: float = 0.05) -> str:
+    # Swaps characters EasyOCR commonly confuses (0/O, 1/l/I) at the given rate.
+    rng = random.Random(seed)
+    return "".join(
+        rng.choice(OCR_CONFUSIONS[char]) if char in OCR_CONFUSIONS and rng.random() < rate else char
+        for char in text
+    )
+
+
+def text_pdf(pages: int, seed: int = 0) -> bytes:
+    doc = fitz.open()
+    for page_number in range(pages):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(54, 54, 558, 738), report_text(seed + page_number), fontsize=11)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def scanned_pdf(pages: int, seed: int = 0, dpi: int = 150) -> bytes:
+    # Render each text page to pixels and re-embed it as an image, leaving no text layer.
+    source = fitz.open(stream=text_pdf(pages, seed), filetype="pdf")
+    scanned = fitz.open()
+    for page in source:
+        pix = page.get_pixmap(dpi=dpi)
+        target = scanned.new_page(width=page.rect.width, height=page.rect.height)
+        target.insert_image(target.rect, stream=pix.tobytes("png"))
+    data = scanned.tobytes()
+    source.close()
+    scanned.close()
+    return data
+
+
+def report_image(image_format: str = "PNG", seed: int = 0, dpi: int = 150) -> bytes:
+    with fitz.open(stream=text_pdf(1, seed), filetype="pdf") as doc:
+        pix = doc[0].get_pixmap(dpi=dpi)
+        image = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def photo_image(seed: int = 0, dpi: int = 300, skew_degrees: float = 2.0, image_format: str = "JPEG") -> bytes:
+    # A phone-camera stand-in: high resolution, slightly rotated, with a grey border around the page.
+    with Image.open(io.BytesIO(report_image("PNG", seed, dpi))) as page:
+        rotated = page.rotate(skew_degrees, resample=Image.BILINEAR, expand=True, fillcolor=(255, 255, 255))
+    canvas = Image.new("RGB", (rotated.width + 400, rotated.height + 400), (96, 96, 96))
+    canvas.paste(rotated, (200, 200))
+    buffer = io.BytesIO()
+    canvas.save(buffer, format=image_format, quality=90)
+    return buffer.getvalue()
+
+
+def symptom_strings(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return [", ".join(rng.sample(SYMPTOMS, k=rng.randint(2, 5))) for _ in range(count)]
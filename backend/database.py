@@ -1,18 +1,73 @@
-from typing import Any
+import logging
+from typing import Any, Dict, List
 
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
 
 from .settings import get_settings
 
 
+logger = logging.getLogger(__name__)
+
 client: AsyncIOMotorClient | None = None
 database: AsyncIOMotorDatabase | None = None
 
+REQUIRED_INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+        # Only users who revoked their tokens carry a token_version; the periodic refresh reads just those.
+        IndexModel([("token_version", ASCENDING)], sparse=True, name="token_version_sparse"),
+    ],
+    "reports": [
+        IndexModel(
+            [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="user_id_created_at_id",
+        ),
+        IndexModel([("user_id", ASCENDING), ("source_sha256", ASCENDING)], name="user_id_source_sha256"),
+        # Only background jobs carry a status; the orphan sweep reads the pending/processing range of it.
+        IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING)], sparse=True, name="status_lease_expires_at"),
+        # The user_id prefix keeps each search inside one user's postings instead of the whole collection.
+        # search_terms carries the words of long reports beyond the inline extracted_text preview.
+        IndexModel(
+            [
+                ("user_id", ASCENDING),
+                ("key_terms", TEXT),
+                ("lab_values.analyte", TEXT),
+                ("insights", TEXT),
+                ("extracted_text", TEXT),
+                ("search_terms", TEXT),
+            ],
+            weights={"key_terms": 5, "lab_values.analyte": 5, "insights": 3, "extracted_text": 1, "search_terms": 1},
+            default_language="english",
+            language_override="search_language",
+            name="user_id_report_search",
+        ),
+    ],
+}
+
+# Indexes replaced by a differently-shaped one. A collection can only hold one text index, so the old
+# text index has to go before its successor can be built.
+SUPERSEDED_INDEXES: Dict[str, List[str]] = {
+    "reports": ["user_id_report_text"],
+}
+
 
 async def connect_to_mongo() -> None:
     global client, database
     settings = get_settings()
-    client = AsyncIOMotorClient(settings.mongo_uri)
+    options: Dict[str, Any] = {
+        "maxPoolSize": settings.mongo_max_pool_size,
+        "minPoolSize": settings.mongo_min_pool_size,
+        "maxIdleTimeMS": settings.mongo_max_idle_time_ms,
+        "connectTimeoutMS": settings.mongo_connect_timeout_ms,
+        "serverSelectionTimeoutMS": settings.mongo_server_selection_timeout_ms,
+    }
+    if settings.mongo_socket_timeout_ms:
+        options["socketTimeoutMS"] = settings.mongo_socket_timeout_ms
+    if settings.mongo_compressors:
+        options["compressors"] = settings.mongo_compressors
+    client = AsyncIOMotorClient(settings.mongo_uri, **options)
     database = client[settings.mongo_db_name]
 
 
@@ -30,3 +85,31 @@ def get_database() -> AsyncIOMotorDatabase:
 def get_collection(name: str) -> Any:
     db = get_database()
     return db[name]
+
+
+async def ensure_indexes() -> None:
+    for name, index_names in SUPERSEDED_INDEXES.items():
+        existing = await get_collection(name).index_information()
+        for index_name in index_names:
+            if index_name in existing:
+                logger.info("Dropping superseded index %s.%s", name, index_name)
+                await get_collection(name).drop_index(index_name)
+    for name, indexes in REQUIRED_INDEXES.items():
+        try:
+            await get_collection(name).create_indexes(indexes)
+        except OperationFailure as exc:
+            # e.g. duplicate emails block the unique index; report it and keep serving.
+            logger.warning("Could not create indexes on %s: %s", name, exc)
+
+
+async def find_missing_indexes() -> Dict[str, List[str]]:
+    missing: Dict[str, List[str]] = {}
+    for name, indexes in REQUIRED_INDEXES.items():
+        existing = await get_collection(name).index_information()
+        existing_keys = [list(info["key"]) for info in existing.values()]
+        for index in indexes:
+            spec = index.document
+            # Text indexes are stored under internal _fts keys, so those are matched by name.
+            if spec["name"] not in existing and [tuple(item) for item in spec["key"].items()] not in existing_keys:
+                missing.setdefault(name, []).append(spec["name"])
+    return missing
@@ -1,13 +1,30 @@
-from fastapi import FastAPI
+import logging
+import time
+
+from fastapi import FastAPI, HTTPException, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from .database import connect_to_mongo, close_mongo_connection
-from .routers import auth, report_analyzer, symptom_checker
+from .database import connect_to_mongo, close_mongo_connection, ensure_indexes, find_missing_indexes
+from .nlp.summarizer import get_summarizer, start_summarizer, stop_summarizer
+from .ocr.pool import get_ocr_pool, start_ocr_pool, stop_ocr_pool
+from .routers import admin, auth, report_analyzer, symptom_checker
+from .services.metrics import http_request_seconds, register_callback, render_metrics
+from .services.model_registry import model_registry
+from .services.model_reloader import start_model_reloader, stop_model_reloader
+from .services.profiling import RequestProfiler
+from .services.report_jobs import get_report_job_queue, start_report_jobs, stop_report_jobs
+from .services.result_cache import get_result_cache, start_result_cache
+from .services.token_versions import start_token_version_store, stop_token_version_store
 from .services.user_service import ensure_default_user
 from .settings import get_settings
 
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
+# NODE_ROLE=api serves auth and report reads; NODE_ROLE=worker serves the routes that run the pipeline.
+SERVES_API = settings.node_role in {"all", "api"}
+RUNS_WORKERS = settings.node_role in {"all", "worker"}
 
 app = FastAPI(
     title="AI Medical Report Analyzer and Symptom Checker",
@@ -23,23 +40,183 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+async def _is_admin_request(request: Request) -> bool:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        await auth.get_admin_user(await auth.get_current_user(token))
+    except HTTPException:
+        return False
+    return True
+
+
+request_profiler = RequestProfiler(
+    enabled=settings.profiling_enabled,
+    sample_rate=settings.profile_sample_rate,
+    directory=settings.profile_dir,
+    max_files=settings.profile_max_files,
+    authorize=_is_admin_request,
+)
+if settings.profiling_enabled:
+    app.middleware("http")(request_profiler)
+
+
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        http_request_seconds.observe(
+            time.perf_counter() - started, request.method, _route_template(request), str(status_code)
+        )
+
+
+def _route_template(request: Request) -> str:
+    # Label by route template rather than raw path to keep the series count bounded.
+    route = request.scope.get("route")
+    if route is None:
+        return "unmatched"
+    # FastAPI versions that keep included routers unflattened hand back the route without its include
+    # prefix; the prefix is the part of the URL before the span the route itself matches.
+    path = request.url.path
+    for index, char in enumerate(path):
+        if char == "/" and route.path_regex.match(path[index:]):
+            return path[:index] + route.path
+    return route.path
+
+
+def _register_component_metrics() -> None:
+    register_callback("medical_analyzer_ocr_in_flight", "OCR requests admitted to the pool.", lambda: get_ocr_pool().in_flight)
+    register_callback(
+        "medical_analyzer_ocr_capacity", "OCR requests admitted before the pool rejects.", lambda: get_ocr_pool().capacity
+    )
+    register_callback(
+        "medical_analyzer_ocr_pool_restarts_total",
+        "OCR pools rebuilt after a worker process died.",
+        lambda: get_ocr_pool().restarts,
+        kind="counter",
+    )
+    register_callback(
+        "medical_analyzer_report_job_queue_depth",
+        "Background report jobs waiting for a worker.",
+        lambda: get_report_job_queue().depth,
+    )
+    register_callback(
+        "medical_analyzer_symptom_batch_pending",
+        "Symptom requests waiting for the next micro-batch.",
+        lambda: symptom_checker.batcher.pending,
+    )
+    register_callback(
+        "medical_analyzer_result_cache_hits_total",
+        "Report result cache hits (memory or Mongo).",
+        lambda: get_result_cache().memory_hits + get_result_cache().store_hits,
+        kind="counter",
+    )
+    register_callback(
+        "medical_analyzer_result_cache_misses_total",
+        "Report result cache misses.",
+        lambda: get_result_cache().misses,
+        kind="counter",
+    )
+    register_callback(
+        "medical_analyzer_result_cache_hit_ratio",
+        "Share of report lookups served from the cache.",
+        lambda: get_result_cache().stats()["hit_ratio"],
+    )
+    register_callback(
+        "medical_analyzer_llm_breaker_open",
+        "1 while the OpenAI circuit breaker is open.",
+        lambda: float(get_summarizer().breaker.state == "open"),
+    )
+
+
+if settings.metrics_enabled:
+    app.middleware("http")(record_request_latency)
+    if RUNS_WORKERS:
+        _register_component_metrics()
+
 
 @app.on_event("startup")
 async def startup_event() -> None:
     await connect_to_mongo()
-    await ensure_default_user()
+    await ensure_indexes()
+    missing_indexes = await find_missing_indexes()
+    if missing_indexes:
+        logger.warning("MongoDB indexes missing, queries will scan: %s", missing_indexes)
+    await start_token_version_store(settings.token_version_refresh_seconds)
+    if SERVES_API:
+        await ensure_default_user()
+    if RUNS_WORKERS:
+        await _start_workers()
+
+
+async def _start_workers() -> None:
+    await start_result_cache(max_entries=settings.result_cache_size, ttl_seconds=settings.result_cache_ttl_seconds)
+    start_ocr_pool(
+        max_workers=settings.ocr_workers,
+        queue_size=settings.ocr_queue_size,
+        timeout=settings.ocr_timeout_seconds,
+        retry_after=settings.ocr_retry_after_seconds,
+    )
+    start_summarizer(settings)
+    start_report_jobs(
+        workers=settings.report_job_workers,
+        queue_size=settings.report_job_queue_size,
+        lease_seconds=settings.report_job_lease_seconds,
+    )
+    model_registry.start_warmup()
+    start_model_reloader(settings.model_reload_interval_seconds)
 
 
 @app.on_event("shutdown")
 async def shutdown_event() -> None:
+    await stop_model_reloader()
+    await stop_report_jobs()
+    stop_ocr_pool()
+    await stop_summarizer()
+    await stop_token_version_store()
     await close_mongo_connection()
 
 
-app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
-app.include_router(report_analyzer.router, prefix="/api/reports", tags=["Reports"])
-app.include_router(symptom_checker.router, prefix="/api/symptoms", tags=["Symptom Checker"])
+if SERVES_API:
+    app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
+    app.include_router(report_analyzer.router, prefix="/api/reports", tags=["Reports"])
+if RUNS_WORKERS:
+    app.include_router(report_analyzer.processing_router, prefix="/api/reports", tags=["Reports"])
+    app.include_router(symptom_checker.router, prefix="/api/symptoms", tags=["Symptom Checker"])
+    app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 
 @app.get("/health")
 async def health_check() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@app.get("/ready")
+async def readiness_check() -> JSONResponse:
+    # API-only nodes load no models, so they are ready once startup completes.
+    ready = model_registry.ready if RUNS_WORKERS else True
+    components = model_registry.components if RUNS_WORKERS else {}
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "ready" if ready else "warming", "components": components},
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    if not settings.metrics_enabled:
+        return PlainTextResponse("metrics disabled\n", status_code=status.HTTP_404_NOT_FOUND)
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+async def cache_stats() -> dict:
+    return get_result_cache().stats()
+
+
+if RUNS_WORKERS:
+    app.get("/cache/stats")(cache_stats)
@@ -0,0 +1,79 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+MODEL_DIR = Path(__file__).resolve().parent
+ARTIFACTS_DIR = MODEL_DIR / "artifacts"
+CURRENT_POINTER = ARTIFACTS_DIR / "CURRENT"
+MANIFEST_NAME = "manifest.json"
+
+
+def new_version_dir(data_hash: str) -> Path:
+    # Sortable by creation time; the data hash prefix tells two same-second runs apart.
+    version = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{data_hash[:8]}"
+    directory = ARTIFACTS_DIR / version
+    directory.mkdir(parents=True, exist_ok=False)
+    return directory
+
+
+def publish_version(directory: Path, manifest: Dict[str, Any]) -> None:
+    # The manifest is written last and the pointer swapped atomically, so readers never see a partial version.
+    manifest = {"version": directory.name, "created_at": datetime.utcnow().isoformat(), **manifest}
+    (directory / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+    set_current_version(directory.name)
+
+
+def set_current_version(version: str) -> None:
+    fd, temp_name = tempfile.mkstemp(dir=ARTIFACTS_DIR, prefix=".CURRENT-")
+    with os.fdopen(fd, "w") as handle:
+        handle.write(version)
+    os.replace(temp_name, CURRENT_POINTER)
+
+
+def current_version_name() -> str | None:
+    try:
+        return CURRENT_POINTER.read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def current_version_dir() -> Path | None:
+    name = current_version_name()
+    if name is None:
+        return None
+    directory = ARTIFACTS_DIR / name
+    return directory if (directory / MANIFEST_NAME).exists() else None
+
+
+def read_manifest(directory: Path) -> Dict[str, Any]:
+    return json.loads((directory / MANIFEST_NAME).read_text())
+
+
+def list_versions() -> List[Path]:
+    if not ARTIFACTS_DIR.exists():
+        return []
+    return sorted(path for path in ARTIFACTS_DIR.iterdir() if (path / MANIFEST_NAME).exists())
+
+
+def load_version(directory: Path) -> tuple[Any, Any]:
+    import joblib
+
+    from .compact import load_compact_artifacts
+
+    compact_dir = directory / "compact"
+    if (compact_dir / "meta.json").exists():
+        return load_compact_artifacts(compact_dir)
+    return joblib.load(directory / "model.joblib"), joblib.load(directory / "vectorizer.joblib")
+
+
+def prune_versions(keep: int) -> None:
+    current = current_version_dir()
+    versions = list_versions()
+    for directory in versions[:max(0, len(versions) - keep)]:
+        if directory != current:
+            shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from scipy import sparse
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+
+COMPACT_FORMAT_VERSION = 1
+DEFAULT_TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+
+
+class CompactForest:
+    def __init__(
+        self,
+        classes: List[str],
+        roots: np.ndarray,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        values: np.ndarray,
+        max_depth: int,
+    ) -> None:
+        self.classes_ = np.asarray(classes, dtype=object)
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.values = values
+        self.max_depth = max_depth
+
+    def predict_proba(self, X) -> np.ndarray:
+        # sklearn compares float32 features against float64 thresholds; do the same so splits match exactly.
+        dense = X.astype(np.float32).toarray() if sparse.issparse(X) else np.asarray(X, dtype=np.float32)
+        rows = np.arange(dense.shape[0])[:, None]
+        nodes = np.repeat(self.roots[None, :], dense.shape[0], axis=0)
+        # Leaves point at themselves, so every tree can be stepped in lockstep for max_depth levels.
+        for _ in range(self.max_depth):
+            go_left = dense[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return self.values[nodes].mean(axis=1, dtype=np.float64)
+
+
+class CompactVectorizer:
+    def __init__(self, terms: np.ndarray, columns: np.ndarray, idf: np.ndarray, ngram_range: List[int], token_pattern: str) -> None:
+        self.vocabulary_ = terms
+        self.columns = columns
+        self.idf_ = idf
+        self.ngram_range = tuple(ngram_range)
+        self._token_pattern = re.compile(token_pattern)
+
+    def transform(self, raw_documents: List[str]) -> sparse.csr_matrix:
+        indptr = [0]
+        indices: List[np.ndarray] = []
+        data: List[np.ndarray] = []
+        for document in raw_documents:
+            columns, counts = self._count(document)
+            weights = counts * self.idf_[columns]
+            norm = np.sqrt(np.dot(weights, weights))
+            if norm:
+                weights /= norm
+            indices.append(columns)
+            data.append(weights)
+            indptr.append(indptr[-1] + len(columns))
+        return sparse.csr_matrix(
+            (
+                np.concatenate(data) if data else np.empty(0),
+                np.concatenate(indices) if indices else np.empty(0, dtype=np.int64),
+                np.asarray(indptr),
+            ),
+            shape=(len(raw_documents), len(self.idf_)),
+        )
+
+    def _count(self, document: str) -> tuple[np.ndarray, np.ndarray]:
+        tokens = self._token_pattern.findall(document.lower())
+        min_n, max_n = self.ngram_range
+        ngrams = [
+            " ".join(tokens[start:start + n])
+            for n in range(min_n, max_n + 1)
+            for start in range(len(tokens) - n + 1)
+        ]
+        if not ngrams or not len(self.vocabulary_):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        candidates = np.asarray(ngrams)
+        positions = np.searchsorted(self.vocabulary_, candidates).clip(max=len(self.vocabulary_) - 1)
+        matches = self.vocabulary_[positions] == candidates
+        columns, counts = np.unique(self.columns[positions[matches]], return_counts=True)
+        return columns.astype(np.int64), counts.astype(np.float64)
+
+
+def export_compact_artifacts(model: RandomForestClassifier, vectorizer: TfidfVectorizer, directory: Path) -> None:
+    _check_vectorizer_supported(vectorizer)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    roots, features, thresholds, lefts, rights, values = [], [], [], [], [], []
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        node_ids = np.arange(tree.node_count)
+        is_leaf = tree.children_left == -1
+        roots.append(offset)
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(tree.threshold)
+        lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+        rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+        leaf_values = tree.value[:, 0, :]
+        values.append(leaf_values / leaf_values.sum(axis=1, keepdims=True))
+        offset += tree.node_count
+
+    np.save(directory / "tree_roots.npy", np.asarray(roots, dtype=np.int64))
+    np.save(directory / "tree_feature.npy", np.concatenate(features).astype(np.int32))
+    np.save(directory / "tree_threshold.npy", np.concatenate(thresholds).astype(np.float64))
+    np.save(directory / "tree_left.npy", np.concatenate(lefts).astype(np.int64))
+    np.save(directory / "tree_right.npy", np.concatenate(rights).astype(np.int64))
+    np.save(directory / "tree_values.npy", np.concatenate(values).astype(np.float32))
+
+    terms = sorted(vectorizer.vocabulary_)
+    np.save(directory / "vocab_terms.npy", np.asarray(terms, dtype=str))
+    np.save(directory / "vocab_columns.npy", np.asarray([vectorizer.vocabulary_[term] for term in terms], dtype=np.int64))
+    np.save(directory / "idf.npy", vectorizer.idf_.astype(np.float64))
+
+    meta = {
+        "format_version": COMPACT_FORMAT_VERSION,
+        "classes": [str(label) for label in model.classes_],
+        "max_depth": int(max(estimator.tree_.max_depth for estimator in model.estimators_)),
+        "ngram_range": list(vectorizer.ngram_range),
+        "token_pattern": vectorizer.token_pattern,
+    }
+    # meta.json is written last: its presence marks a complete export.
+    (directory / "meta.json").write_text(json.dumps(meta))
+
+
+def load_compact_artifacts(directory: Path) -> tuple[CompactForest, CompactVectorizer]:
+    meta = json.loads((directory / "meta.json").read_text())
+    if meta.get("format_version") != COMPACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported compact artifact format: {meta.get('format_version')}")
+
+    def load(name: str) -> np.ndarray:
+        return np.load(directory / f"{name}.npy", mmap_mode="r")
+
+    forest = CompactForest(
+        classes=meta["classes"],
+        roots=np.asarray(load("tree_roots")),
+        feature=load("tree_feature"),
+        threshold=load("tree_threshold"),
+        left=load("tree_left"),
+        right=load("tree_right"),
+        values=load("tree_values"),
+        max_depth=meta["max_depth"],
+    )
+    vectorizer = CompactVectorizer(
+        terms=load("vocab_terms"),
+        columns=load("vocab_columns"),
+        idf=load("idf"),
+        ngram_range=meta["ngram_range"],
+        token_pattern=meta["token_pattern"],
+    )
+    return forest, vectorizer
+
+
+def _check_vectorizer_supported(vectorizer: TfidfVectorizer) -> None:
+    supported = (
+        vectorizer.analyzer == "word"
+        and vectorizer.lowercase
+        and vectorizer.preprocessor is None
+        and vectorizer.tokenizer is None
+        and vectorizer.strip_accents is None
+        and vectorizer.stop_words is None
+        and vectorizer.norm == "l2"
+        and vectorizer.use_idf
+        and not vectorizer.sublinear_tf
+        and not vectorizer.binary
+    )
+    if not supported:
+        raise ValueError("Compact export only supports word n-gram TF-IDF with l2 norm and default preprocessing.")
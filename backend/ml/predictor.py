@@ -1,95 +1,196 @@
 from __future__ import annotations
 
+import logging
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Callable, List
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple
 
-import joblib
-import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.feature_extraction.text import TfidfVectorizer
+from ..nlp.lexicon import get_lexicon_matcher
+from .artifacts import ARTIFACTS_DIR, MANIFEST_NAME, MODEL_DIR, current_version_dir, load_version
 
+# numpy, scipy and sklearn are imported where a model is loaded or scored, so importing this module stays cheap.
+if TYPE_CHECKING:
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+    from sklearn.linear_model import SGDClassifier
 
+    from .compact import CompactForest, CompactVectorizer
 
-MODEL_DIR = Path(__file__).resolve().parent
+
+# Unversioned artifacts from older training runs, used when no published version exists.
 MODEL_PATH = MODEL_DIR / "model.joblib"
 VECTORIZER_PATH = MODEL_DIR / "vectorizer.joblib"
+COMPACT_DIR = MODEL_DIR / "compact"
+COMPACT_META_PATH = COMPACT_DIR / "meta.json"
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
 class PredictorArtifacts:
-    model: RandomForestClassifier
-    vectorizer: TfidfVectorizer
+    model: RandomForestClassifier | CompactForest | SGDClassifier
+    vectorizer: TfidfVectorizer | CompactVectorizer | HashingVectorizer
     fallback: Callable[[str], List[str]]
+    version: str
+
+
+class ModelValidationError(ValueError):
+    pass
+
+
+# Representative inputs every candidate model must score sanely before it replaces the live one.
+CANARY_TEXTS = [
+    "Glucose 182 mg/dL, HbA1c 7.9%. Patient reports excessive thirst and fatigue.",
+    "Hemoglobin 9.8 g/dL, pale skin and dizziness.",
+    "Blood pressure 162/98 mmHg over three readings, occasional headaches.",
+    "All laboratory values within reference ranges.",
+]
 
 
 class Predictor:
     def __init__(self) -> None:
+        self._fallback = self._make_fallback()
         self.artifacts = self._load_artifacts()
 
+    @property
+    def version(self) -> str:
+        return self.artifacts.version
+
     def _load_artifacts(self) -> PredictorArtifacts:
-        if MODEL_PATH.exists() and VECTORIZER_PATH.exists():
+        version_dir = current_version_dir()
+        if version_dir is not None:
+            try:
+                return self._load_version_artifacts(version_dir)
+            except Exception:
+                # A broken publish must not stop workers from booting; the reloader picks up the next good one.
+                logger.exception("Could not load model version %s; using legacy artifacts", version_dir.name)
+        if COMPACT_META_PATH.exists():
+            from .compact import load_compact_artifacts
+
+            # Memory-mapped arrays are shared through the page cache by every worker on the host.
+            model, vectorizer = load_compact_artifacts(COMPACT_DIR)
+            version = f"compact-{COMPACT_META_PATH.stat().st_mtime_ns}"
+        elif MODEL_PATH.exists() and VECTORIZER_PATH.exists():
+            import joblib
+
             model = joblib.load(MODEL_PATH)
             vectorizer = joblib.load(VECTORIZER_PATH)
+            version = f"{MODEL_PATH.stat().st_mtime_ns}-{VECTORIZER_PATH.stat().st_mtime_ns}"
         else:
+            from sklearn.ensemble import RandomForestClassifier
+            from sklearn.feature_extraction.text import TfidfVectorizer
+
             model = RandomForestClassifier()
             vectorizer = TfidfVectorizer()
-        fallback = self._make_fallback()
-        return PredictorArtifacts(model=model, vectorizer=vectorizer, fallback=fallback)
+            version = "fallback"
+        return PredictorArtifacts(model=model, vectorizer=vectorizer, fallback=self._fallback, version=version)
+
+    def _load_version_artifacts(self, version_dir: Path) -> PredictorArtifacts:
+        model, vectorizer = load_version(version_dir)
+        return PredictorArtifacts(model=model, vectorizer=vectorizer, fallback=self._fallback, version=version_dir.name)
+
+    def reload(self, version: str | None = None) -> str:
+        if version is not None and Path(version).name != version:
+            raise FileNotFoundError(f"Invalid model version {version!r}.")
+        version_dir = ARTIFACTS_DIR / version if version else current_version_dir()
+        if version_dir is None or not (version_dir / MANIFEST_NAME).exists():
+            raise FileNotFoundError(f"Model version {version or 'CURRENT'} not found in {ARTIFACTS_DIR}.")
+        try:
+            candidate = self._load_version_artifacts(version_dir)
+        except Exception as exc:
+            raise ModelValidationError(f"Model {version_dir.name} could not be loaded: {exc}") from exc
+        self.validate(candidate)
+        # A single reference assignment: in-flight batches keep the artifacts they started with.
+        self.artifacts = candidate
+        return candidate.version
+
+    def validate(self, artifacts: PredictorArtifacts) -> None:
+        import numpy as np
+
+        if not _is_ready(artifacts):
+            raise ModelValidationError(f"Model {artifacts.version} is not fitted.")
+        try:
+            probabilities = np.asarray(artifacts.model.predict_proba(artifacts.vectorizer.transform(CANARY_TEXTS)))
+        except Exception as exc:
+            raise ModelValidationError(f"Model {artifacts.version} failed on the canary batch: {exc}") from exc
+        expected_shape = (len(CANARY_TEXTS), len(artifacts.model.classes_))
+        if probabilities.shape != expected_shape:
+            raise ModelValidationError(
+                f"Model {artifacts.version} returned shape {probabilities.shape}, expected {expected_shape}."
+            )
+        if not np.isfinite(probabilities).all() or not np.allclose(probabilities.sum(axis=1), 1.0, atol=1e-3):
+            raise ModelValidationError(f"Model {artifacts.version} returned invalid probabilities on the canary batch.")
 
     def predict(self, report_text: str, key_terms: List[str]) -> List[str]:
-        combined_input = " ".join([report_text, " ".join(key_terms)])
-        if self._is_vectorizer_ready():
-            vector = self.artifacts.vectorizer.transform([combined_input])
-        else:
-            return self.artifacts.fallback(combined_input)
-
-        if hasattr(self.artifacts.model, "predict_proba") and getattr(self.artifacts.model, "classes_", None) is not None:
-            probabilities = self.artifacts.model.predict_proba(vector)[0]
-            classes = getattr(self.artifacts.model, "classes_", [])
-            sorted_indices = np.argsort(probabilities)[::-1]
-            insights = [
-                f"{classes[idx]}: {probabilities[idx]:.2%}"
-                for idx in sorted_indices[:3]
-            ]
-            return insights
-        return self.artifacts.fallback(combined_input)
+        return self.predict_reports([report_text], [key_terms])[0]
 
-    def predict_from_symptoms(self, symptoms: str) -> List[str]:
-        if self._is_vectorizer_ready():
-            vector = self.artifacts.vectorizer.transform([symptoms])
-        else:
-            return self.artifacts.fallback(symptoms)
+    def predict_reports(self, report_texts: List[str], key_terms: List[List[str]]) -> List[List[str]]:
+        return self.predict_reports_versioned(report_texts, key_terms)[0]
 
-        if hasattr(self.artifacts.model, "predict_proba") and getattr(self.artifacts.model, "classes_", None) is not None:
-            probabilities = self.artifacts.model.predict_proba(vector)[0]
-            classes = getattr(self.artifacts.model, "classes_", [])
-            sorted_indices = np.argsort(probabilities)[::-1]
-            return [
-                f"{classes[idx]}: {probabilities[idx]:.2%}"
-                for idx in sorted_indices[:3]
-            ]
-        return self.artifacts.fallback(symptoms)
+    def predict_reports_versioned(
+        self, report_texts: List[str], key_terms: List[List[str]]
+    ) -> Tuple[List[List[str]], str]:
+        combined_inputs = [" ".join([text, " ".join(terms)]) for text, terms in zip(report_texts, key_terms)]
+        return self.predict_batch_versioned(combined_inputs)
 
-    def _is_vectorizer_ready(self) -> bool:
-        return hasattr(self.artifacts.vectorizer, "vocabulary_") and self.artifacts.vectorizer.vocabulary_
+    def predict_from_symptoms(self, symptoms: str) -> List[str]:
+        return self.predict_batch([symptoms])[0]
+
+    def predict_batch(self, texts: List[str], top_k: int = 3) -> List[List[str]]:
+        return self.predict_batch_versioned(texts, top_k)[0]
+
+    def predict_batch_versioned(self, texts: List[str], top_k: int = 3) -> Tuple[List[List[str]], str]:
+        import numpy as np
+
+        # Read the reference once so a concurrent reload cannot mix two models within one batch.
+        artifacts = self.artifacts
+        if not texts:
+            return [], artifacts.version
+        if not _is_ready(artifacts):
+            return [artifacts.fallback(text) for text in texts], artifacts.version
+
+        vectors = artifacts.vectorizer.transform(texts)
+        probabilities = artifacts.model.predict_proba(vectors)
+        classes = artifacts.model.classes_
+
+        # argpartition picks each row's top-k in O(n_classes); only those k are then sorted.
+        k = min(top_k, probabilities.shape[1])
+        top_indices = np.argpartition(-probabilities, k - 1, axis=1)[:, :k]
+        top_probabilities = np.take_along_axis(probabilities, top_indices, axis=1)
+        order = np.argsort(-top_probabilities, axis=1, kind="stable")
+        top_indices = np.take_along_axis(top_indices, order, axis=1)
+        predictions = [
+            [f"{classes[idx]}: {row[idx]:.2%}" for idx in indices]
+            for row, indices in zip(probabilities, top_indices)
+        ]
+        return predictions, artifacts.version
 
     def _make_fallback(self) -> Callable[[str], List[str]]:
-        keyword_map = {
-            "glucose": "Potential elevated blood sugar levels",
-            "insulin": "Consider diabetes screening",
-            "anemia": "Possible anemia indicators present",
-            "hemoglobin": "Check hemoglobin trends",
-            "cholesterol": "Lipids may be elevated",
-            "pressure": "Monitor blood pressure closely",
-            "fatigue": "General fatigue reported",
-        }
+        matcher = get_lexicon_matcher()
 
         def _fallback(text: str) -> List[str]:
-            lowered = text.lower()
-            matches = [message for keyword, message in keyword_map.items() if keyword in lowered]
+            insights: Dict[str, None] = {}
+            for match in matcher.match(text):
+                if not match.negated and match.entry.insight:
+                    insights.setdefault(match.entry.insight)
+            matches = list(insights)
             if not matches:
                 matches = ["No strong indicators detected — consider consulting a clinician."]
             return matches[:3]
 
         return _fallback
+
+
+def _is_ready(artifacts: PredictorArtifacts) -> bool:
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    vectorizer, model = artifacts.vectorizer, artifacts.model
+    vectorizer_ready = isinstance(vectorizer, HashingVectorizer) or len(getattr(vectorizer, "vocabulary_", ())) > 0
+    model_ready = hasattr(model, "predict_proba") and getattr(model, "classes_", None) is not None
+    return vectorizer_ready and model_ready
+
+
+@lru_cache(maxsize=1)
+def get_predictor() -> Predictor:
+    return Predictor()
@@ -1,39 +1,240 @@
+import argparse
+import hashlib
+import json
+import math
+import random
+import time
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Dict, Iterator, List, Set, Tuple
 
 import joblib
 import pandas as pd
+from scipy import sparse
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.model_selection import train_test_split
-from sklearn.pipeline import Pipeline
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import SGDClassifier
 from sklearn.metrics import classification_report
 
-from .predictor import MODEL_PATH, VECTORIZER_PATH
+from .artifacts import MODEL_DIR, current_version_dir, new_version_dir, prune_versions, publish_version, read_manifest
+from .compact import export_compact_artifacts
 
 
-def train_model_from_csv(csv_path: Path) -> None:
-    data = pd.read_csv(csv_path)
-    texts = data["text"]
-    labels = data["label"]
+SAMPLE_CSV = MODEL_DIR / "sample_training_data.csv"
+FEATURE_CACHE_DIR = MODEL_DIR / "cache"
+CSV_CHUNK_ROWS = 50_000
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+TFIDF_PARAMS = {"ngram_range": (1, 2), "max_features": 5000}
+# Stateless features let the SGD model learn from new rows without refitting a vocabulary.
+HASHING_PARAMS = {"ngram_range": (1, 2), "n_features": 2**20, "alternate_sign": False}
 
-    X_train, X_test, y_train, y_test = train_test_split(texts, labels, test_size=0.2, random_state=42)
 
-    vectorizer = TfidfVectorizer(ngram_range=(1, 2), max_features=5000)
-    classifier = RandomForestClassifier(n_estimators=200, random_state=42)
+class StageTimer:
+    def __init__(self) -> None:
+        self.timings: Dict[str, float] = {}
 
-    pipeline = Pipeline([("vectorizer", vectorizer), ("classifier", classifier)])
-    pipeline.fit(X_train, y_train)
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round(time.perf_counter() - started, 3)
+            print(f"[train] {name}: {self.timings[name]:.2f}s")
 
-    predictions = pipeline.predict(X_test)
-    report = classification_report(y_test, predictions)
-    print("Evaluation report:\n", report)
 
-    joblib.dump(pipeline.named_steps["classifier"], MODEL_PATH)
-    joblib.dump(pipeline.named_steps["vectorizer"], VECTORIZER_PATH)
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        while block := handle.read(1024 * 1024):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def iter_training_chunks(csv_path: Path, chunk_rows: int = CSV_CHUNK_ROWS) -> Iterator[Tuple[List[str], List[str]]]:
+    for chunk in pd.read_csv(csv_path, usecols=["text", "label"], dtype=str, chunksize=chunk_rows):
+        chunk = chunk.dropna()
+        yield chunk["text"].tolist(), chunk["label"].tolist()
+
+
+def split_rows(csv_path: Path, chunk_rows: int = CSV_CHUNK_ROWS) -> Tuple[Set[int], List[str], List[str]]:
+    # Only labels are held in memory; texts are streamed through the vectorizer in two later passes.
+    labels = [label for _, chunk_labels in iter_training_chunks(csv_path, chunk_rows) for label in chunk_labels]
+    test_rows = set(random.Random(RANDOM_STATE).sample(range(len(labels)), math.ceil(len(labels) * TEST_SIZE)))
+    y_train = [label for row, label in enumerate(labels) if row not in test_rows]
+    y_test = [label for row, label in enumerate(labels) if row in test_rows]
+    return test_rows, y_train, y_test
+
+
+def iter_split_texts(csv_path: Path, test_rows: Set[int], test: bool, chunk_rows: int = CSV_CHUNK_ROWS) -> Iterator[str]:
+    row = 0
+    for chunk_texts, _ in iter_training_chunks(csv_path, chunk_rows):
+        for text in chunk_texts:
+            if (row in test_rows) == test:
+                yield text
+            row += 1
+
+
+def vectorize_with_cache(csv_path: Path, data_hash: str, chunk_rows: int = CSV_CHUNK_ROWS, use_cache: bool = True):
+    # TF-IDF fitting is the slow, deterministic part of a rerun on unchanged data, so it is keyed by content
+    # and checked before the CSV is read at all.
+    key_source = {
+        "data": data_hash,
+        "tfidf": TFIDF_PARAMS,
+        "test_size": TEST_SIZE,
+        "random_state": RANDOM_STATE,
+        "split": "streamed",
+    }
+    key = hashlib.sha256(json.dumps(key_source, sort_keys=True).encode()).hexdigest()[:16]
+    paths = {
+        "X_train": FEATURE_CACHE_DIR / f"{key}-X_train.npz",
+        "X_test": FEATURE_CACHE_DIR / f"{key}-X_test.npz",
+        "rest": FEATURE_CACHE_DIR / f"{key}-labels-vectorizer.joblib",
+    }
+    if use_cache and all(path.exists() for path in paths.values()):
+        y_train, y_test, vectorizer = joblib.load(paths["rest"])
+        return vectorizer, sparse.load_npz(paths["X_train"]), sparse.load_npz(paths["X_test"]), y_train, y_test, True
+
+    test_rows, y_train, y_test = split_rows(csv_path, chunk_rows)
+    vectorizer = TfidfVectorizer(**TFIDF_PARAMS)
+    X_train = vectorizer.fit_transform(iter_split_texts(csv_path, test_rows, test=False, chunk_rows=chunk_rows))
+    X_test = vectorizer.transform(iter_split_texts(csv_path, test_rows, test=True, chunk_rows=chunk_rows))
+    if use_cache:
+        FEATURE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        sparse.save_npz(paths["X_train"], X_train.tocsr())
+        sparse.save_npz(paths["X_test"], X_test.tocsr())
+        joblib.dump((y_train, y_test, vectorizer), paths["rest"])
+    return vectorizer, X_train, X_test, y_train, y_test, False
+
+
+def train_model_from_csv(
+    csv_path: Path,
+    n_jobs: int = -1,
+    n_estimators: int = 200,
+    chunk_rows: int = CSV_CHUNK_ROWS,
+    use_cache: bool = True,
+) -> Path:
+    timer = StageTimer()
+    with timer.stage("hash"):
+        data_hash = file_sha256(csv_path)
+    with timer.stage("vectorize"):
+        vectorizer, X_train, X_test, y_train, y_test, cache_hit = vectorize_with_cache(
+            csv_path, data_hash, chunk_rows, use_cache
+        )
+    classifier = RandomForestClassifier(n_estimators=n_estimators, random_state=RANDOM_STATE, n_jobs=n_jobs)
+    with timer.stage("fit"):
+        classifier.fit(X_train, y_train)
+    with timer.stage("evaluate"):
+        predictions = classifier.predict(X_test)
+        report = classification_report(y_test, predictions, zero_division=0, output_dict=True)
+        print("Evaluation report:\n", classification_report(y_test, predictions, zero_division=0))
+    with timer.stage("export"):
+        directory = new_version_dir(data_hash)
+        joblib.dump(classifier, directory / "model.joblib")
+        joblib.dump(vectorizer, directory / "vectorizer.joblib")
+        export_compact_artifacts(classifier, vectorizer, directory / "compact")
+
+    publish_version(
+        directory,
+        {
+            "kind": "random_forest",
+            "data_hash": data_hash,
+            "rows": len(y_train) + len(y_test),
+            "feature_cache_hit": cache_hit,
+            "accuracy": report.get("accuracy"),
+            "timings": timer.timings,
+        },
+    )
+    print(f"Published model version {directory.name}")
+    return directory
+
+
+def train_incremental_from_csv(csv_path: Path, chunk_rows: int = CSV_CHUNK_ROWS, fresh: bool = False) -> Path:
+    timer = StageTimer()
+    data_hash = file_sha256(csv_path)
+    base = None if fresh else current_version_dir()
+    base_manifest = read_manifest(base) if base else {}
+    if not fresh and base_manifest.get("kind") != "sgd_hashing":
+        # Publishing an SGD model fitted on just these rows would replace the serving model on every worker.
+        current = f"the current model ({base.name}, {base_manifest.get('kind')})" if base else "no published model"
+        raise ValueError(
+            f"--incremental updates an existing SGD model, but there is {current}; "
+            "rerun with --fresh to start a new SGD model from these rows only."
+        )
+
+    with timer.stage("load_base"):
+        if base_manifest.get("kind") == "sgd_hashing":
+            model = joblib.load(base / "model.joblib")
+            classes = list(model.classes_)
+            rows_seen = base_manifest.get("rows", 0)
+            unseen = set(pd.read_csv(csv_path, usecols=["label"], dtype=str)["label"].dropna()) - set(classes)
+            if unseen:
+                raise ValueError(
+                    f"Labels {sorted(unseen)} are new to model {base.name}; rerun with --fresh to retrain from scratch."
+                )
+        else:
+            model = SGDClassifier(loss="log_loss", random_state=RANDOM_STATE)
+            classes = sorted(set(pd.read_csv(csv_path, usecols=["label"], dtype=str)["label"].dropna()))
+            rows_seen = 0
+
+    vectorizer = HashingVectorizer(**HASHING_PARAMS)
+    rows = 0
+    with timer.stage("partial_fit"):
+        for chunk_texts, chunk_labels in iter_training_chunks(csv_path, chunk_rows):
+            model.partial_fit(vectorizer.transform(chunk_texts), chunk_labels, classes=classes)
+            rows += len(chunk_texts)
+
+    with timer.stage("export"):
+        directory = new_version_dir(data_hash)
+        joblib.dump(model, directory / "model.joblib")
+        joblib.dump(vectorizer, directory / "vectorizer.joblib")
+
+    publish_version(
+        directory,
+        {
+            "kind": "sgd_hashing",
+            "data_hash": data_hash,
+            "parent": base.name if base else None,
+            "rows": rows_seen + rows,
+            "rows_added": rows,
+            "timings": timer.timings,
+        },
+    )
+    print(f"Published model version {directory.name} ({rows} new rows)")
+    return directory
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train the report classifier and publish a versioned artifact.")
+    parser.add_argument("csv", nargs="?", type=Path, default=SAMPLE_CSV, help="CSV with text,label columns.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Update the current SGD model with these rows instead of retraining the random forest.",
+    )
+    parser.add_argument("--fresh", action="store_true", help="With --incremental, start a new SGD model.")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Parallel tree builders (-1 = all cores).")
+    parser.add_argument("--n-estimators", type=int, default=200)
+    parser.add_argument("--chunk-rows", type=int, default=CSV_CHUNK_ROWS)
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and skip writing cached TF-IDF features.")
+    parser.add_argument("--keep", type=int, default=5, help="Artifact versions to keep on disk.")
+    args = parser.parse_args()
+
+    if not args.csv.exists():
+        raise FileNotFoundError(f"Expected training data at {args.csv}")
+    if args.incremental:
+        train_incremental_from_csv(args.csv, chunk_rows=args.chunk_rows, fresh=args.fresh)
+    else:
+        train_model_from_csv(
+            args.csv,
+            n_jobs=args.n_jobs,
+            n_estimators=args.n_estimators,
+            chunk_rows=args.chunk_rows,
+            use_cache=not args.no_cache,
+        )
+    prune_versions(args.keep)
 
 
 if __name__ == "__main__":
-    sample_csv = Path(__file__).resolve().parent / "sample_training_data.csv"
-    if not sample_csv.exists():
-        raise FileNotFoundError(f"Expected training data at {sample_csv}")
-    train_model_from_csv(sample_csv)
+    main()
@@ -1,8 +1,22 @@
-from typing import List
+from typing import Dict, List
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
+class LabResult(BaseModel):
+    analyte: str
+    category: str
+    value: float
+    unit: str | None = None
+    reference_low: float | None = None
+    reference_high: float | None = None
+    flag: str | None = None
+    comparator: str | None = None
+    secondary_value: float | None = None
+    start: int = 0
+    end: int = 0
+
+
 class MedicalReport(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
 
@@ -11,8 +25,14 @@ class MedicalReport(BaseModel):
     report_name: str
     extracted_text: str
     ai_summary: str
+    key_terms: List[str] = []
+    lab_values: List[LabResult] = []
     insights: List[str]
+    model_version: str | None = None
     created_at: str
+    status: str = "completed"
+    stage: str | None = None
+    error: str | None = None
 
     @field_validator("id", mode="before")
     @classmethod
@@ -20,3 +40,38 @@ class MedicalReport(BaseModel):
         if value is None:
             return value
         return str(value)
+
+
+class ReportSummary(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: str = Field(alias="_id")
+    report_name: str
+    ai_summary: str
+    insights: List[str]
+    created_at: str
+    status: str = "completed"
+
+
+class ReportPage(BaseModel):
+    items: List[ReportSummary]
+    next_cursor: str | None = None
+
+
+class ReportSearchHit(ReportSummary):
+    score: float
+
+
+class ReportSearchPage(BaseModel):
+    items: List[ReportSearchHit]
+    next_offset: int | None = None
+
+
+class InsightBucket(BaseModel):
+    period: str
+    counts: Dict[str, int]
+
+
+class InsightAnalytics(BaseModel):
+    interval: str
+    buckets: List[InsightBucket]
@@ -6,7 +6,7 @@ class User(BaseModel):
 
     id: str | None = Field(default=None, alias="_id")
     email: EmailStr
-    password_hash: str
+    password_hash: str | None = None
     created_at: str
 
     @field_validator("id", mode="before")
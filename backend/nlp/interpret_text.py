@@ -1,90 +1,147 @@
 from __future__ import annotations
 
 import logging
-import os
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import chain, islice
+from typing import TYPE_CHECKING, Dict, Iterable, List
 
-import spacy
-from spacy.language import Language
-from spacy.tokens import Doc
+from ..settings import get_settings
+from .lab_values import LabValue, get_lab_extractor
+from .lexicon import get_lexicon_matcher
 
-try:
-    from openai import OpenAI
-except ImportError:  # pragma: no cover - optional dependency
-    OpenAI = None
+if TYPE_CHECKING:
+    from spacy.language import Language
+    from spacy.tokens import Doc
 
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever analyze() output changes so cached report results are recomputed.
+NLP_VERSION = "5"
+
+# Components each profile drops from en_core_web_sm. Only sentences, lemmas, stop words and
+# entities are used, so the dependency parser is replaced by the rule-based sentencizer.
+PIPELINE_PROFILES: Dict[str, List[str]] = {
+    "full": [],
+    "fast": ["parser"],
+    "minimal": ["parser", "ner"],
+}
+MAX_CHUNK_CHARS = 20_000
+DEFAULT_BATCH_SIZE = 32
+MAX_KEY_TERMS = 10
+
 
 @dataclass
 class NLPResult:
     summary: str
     key_terms: List[str]
     entities: List[str]
+    lab_values: List[LabValue] = field(default_factory=list)
 
 
 class Interpreter:
-    def __init__(self) -> None:
+    def __init__(self, profile: str = "fast") -> None:
+        if profile not in PIPELINE_PROFILES:
+            raise ValueError(f"Unknown NLP profile {profile!r}; expected one of {sorted(PIPELINE_PROFILES)}.")
+        self.profile = profile
         self._nlp = self._load_model()
-        self._openai_client = self._load_openai_client()
 
     def _load_model(self) -> Language:
+        # spaCy and its model take most of a second to import; only processes that analyze text load them.
+        import spacy
+
+        excluded = PIPELINE_PROFILES[self.profile]
         try:
-            nlp = spacy.load("en_core_web_sm")
+            nlp = spacy.load("en_core_web_sm", exclude=excluded)
         except OSError:
             nlp = spacy.blank("en")
-            if "sentencizer" not in nlp.pipe_names:
-                nlp.add_pipe("sentencizer")
+        if "parser" not in nlp.pipe_names and "sentencizer" not in nlp.pipe_names:
+            nlp.add_pipe("sentencizer", first=True)
         return nlp
 
-    def _load_openai_client(self):
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key or OpenAI is None:
-            return None
-        try:
-            return OpenAI(api_key=api_key)
-        except Exception as exc:  # pragma: no cover - depends on env
-            logger.warning("OpenAI client initialization failed: %s", exc)
-            return None
+    def warm(self) -> None:
+        self._nlp("Warm-up report. Hemoglobin and glucose are within the reference range.")
+        get_lab_extractor()
 
     def analyze(self, text: str) -> NLPResult:
-        doc = self._nlp(text)
-        summary = self._summarize(text, doc)
-        key_terms = self._extract_key_terms(doc)
-        entities = [ent.text for ent in doc.ents]
-        return NLPResult(summary=summary, key_terms=key_terms, entities=entities)
-
-    def _summarize(self, original_text: str, doc: Doc) -> str:
-        if self._openai_client:
-            try:
-                response = self._openai_client.responses.create(
-                    model="gpt-4o-mini",
-                    input=f"Summarize this medical report in <=120 words and highlight key findings:\n\n{original_text}",
-                    max_output_tokens=180,
-                )
-                summary = getattr(response, "output_text", "").strip()
-                if summary:
-                    return summary
-            except Exception as exc:  # pragma: no cover - external API
-                logger.warning("OpenAI summary failed, falling back to spaCy: %s", exc)
-
-        sentences = list(doc.sents)
-        if not sentences:
-            return doc.text[:250]
-        top_sentences = sentences[:3]
+        return self.analyze_many([text])[0]
+
+    def analyze_many(
+        self,
+        texts: Iterable[str],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        n_process: int = 1,
+    ) -> List[NLPResult]:
+        texts = list(texts)
+        chunks = [(index, chunk) for index, text in enumerate(texts) for chunk in _chunk_text(text)]
+        docs_per_text: List[List[Doc]] = [[] for _ in texts]
+        docs = self._nlp.pipe((chunk for _, chunk in chunks), batch_size=batch_size, n_process=n_process)
+        for (index, _), doc in zip(chunks, docs):
+            docs_per_text[index].append(doc)
+        return [self._build_result(text, text_docs) for text, text_docs in zip(texts, docs_per_text)]
+
+    def _build_result(self, text: str, docs: List[Doc]) -> NLPResult:
+        summary = self._summarize(text, docs)
+        key_terms = self._extract_key_terms(docs)
+        entities = [ent.text for doc in docs for ent in doc.ents]
+        # Lab values are read from the raw text: spaCy tokenization splits "182mg/dL" and ranges apart.
+        lab_values = get_lab_extractor().extract(text)
+        return NLPResult(summary=summary, key_terms=key_terms, entities=entities, lab_values=lab_values)
+
+    def _summarize(self, original_text: str, docs: List[Doc]) -> str:
+        # LLM summaries are produced asynchronously by nlp.summarizer; this is the local fallback.
+        top_sentences = list(islice(chain.from_iterable(doc.sents for doc in docs), 3))
+        if not top_sentences:
+            return original_text[:250]
         summary = " ".join(sent.text.strip() for sent in top_sentences)
-        return summary or doc.text[:250]
+        return summary or original_text[:250]
+
+    def _extract_key_terms(self, docs: List[Doc]) -> List[str]:
+        # Canonical lexicon concepts (synonyms folded, negated mentions dropped) come first.
+        matcher = get_lexicon_matcher()
+        concepts: Dict[str, None] = {}
+        for doc in docs:
+            concepts.update(dict.fromkeys(matcher.concepts(doc.text)))
+        key_terms = list(concepts)[:MAX_KEY_TERMS]
+        if len(key_terms) < MAX_KEY_TERMS:
+            lemmas = {
+                (token.lemma_ or token.text).lower()
+                for doc in docs
+                for token in doc
+                if token.is_alpha and not token.is_stop
+            }
+            key_terms.extend(sorted(lemmas - concepts.keys())[:MAX_KEY_TERMS - len(key_terms)])
+        return key_terms
+
+
+def _chunk_text(text: str, max_chars: int = MAX_CHUNK_CHARS) -> List[str]:
+    # Split long OCR output on line (or word) boundaries to stay well below spaCy's max_length.
+    if len(text) <= max_chars:
+        return [text]
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + max_chars, len(text))
+        if end < len(text):
+            boundary = text.rfind("\n", start, end)
+            if boundary <= start:
+                boundary = text.rfind(" ", start, end)
+            if boundary > start:
+                end = boundary + 1
+        chunks.append(text[start:end])
+        start = end
+    return chunks
+
+
+@lru_cache(maxsize=1)
+def get_interpreter() -> Interpreter:
+    return Interpreter(profile=get_settings().nlp_profile)
 
-    def _extract_key_terms(self, doc: Doc) -> List[str]:
-        lemmas = [token.lemma_.lower() for token in doc if token.is_alpha and not token.is_stop]
-        unique_lemmas = sorted(set(lemmas))[:10]
-        return unique_lemmas
 
-
-interpreter = Interpreter()
+def interpret_text(text: str) -> NLPResult:
+    return get_interpreter().analyze(text)
 
 
-def interpret_text(text: str) -> NLPResult:
-    return interpreter.analyze(text)
+def interpret_texts(texts: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE, n_process: int = 1) -> List[NLPResult]:
+    return get_interpreter().analyze_many(texts, batch_size=batch_size, n_process=n_process)
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+from ..settings import get_settings
+
+
+DEFAULT_ANALYTES_PATH = Path(__file__).resolve().parent / "data" / "lab_analytes.csv"
+
+# Canonical unit -> spellings seen in reports. OCR confusions (l/1/I, o/0, µ/u) are folded separately.
+UNITS: Dict[str, List[str]] = {
+    "mg/dL": ["mg/dl", "mg/100ml"],
+    "g/dL": ["g/dl", "gm/dl", "gms/dl"],
+    "g/L": ["g/l"],
+    "mg/L": ["mg/l"],
+    "mmol/L": ["mmol/l"],
+    "µmol/L": ["umol/l", "µmol/l", "μmol/l"],
+    "mEq/L": ["meq/l"],
+    "%": ["%"],
+    "10^3/uL": ["10^3/ul", "x10^3/ul", "10*3/ul", "k/ul", "thou/ul", "10^9/l", "x10^9/l"],
+    "/uL": ["/ul", "cells/ul", "/cumm", "/cmm", "/mm3", "cells/mm3"],
+    "10^6/uL": ["10^6/ul", "x10^6/ul", "10*6/ul", "m/ul", "mil/ul", "10^12/l", "x10^12/l"],
+    "fL": ["fl"],
+    "pg/mL": ["pg/ml"],
+    "ng/mL": ["ng/ml"],
+    "ng/dL": ["ng/dl"],
+    "ug/dL": ["ug/dl", "µg/dl", "μg/dl", "mcg/dl"],
+    "U/L": ["u/l", "iu/l"],
+    "mIU/L": ["miu/l", "uiu/ml", "µiu/ml", "μiu/ml"],
+    "mm/hr": ["mm/hr", "mm/h"],
+    "mmHg": ["mmhg", "mm hg"],
+    "mL/min/1.73m2": ["ml/min/1.73m2", "ml/min/1.73m^2", "ml/min/1.73 m2", "ml/min"],
+    "kg/m2": ["kg/m2", "kg/m^2"],
+}
+
+# Characters OCR swaps for one another; aliases and units match any member of a character's group.
+_CONFUSABLE = {"1": "l", "i": "l", "|": "l", "0": "o", "µ": "u", "μ": "u"}
+_FOLD_TABLE = str.maketrans({**_CONFUSABLE, " ": None, "-": None, "\t": None, "\n": None})
+
+# Letters OCR reads in place of 0 and 1 count as digits unless they run into a word ("35IU/L").
+_DIGIT = r"(?:\d|[oil](?![a-hj-km-np-z]))"
+_NUMBER = rf"{_DIGIT}+(?:[.,]{_DIGIT}+)?"
+_DIGIT_TABLE = str.maketrans("OoIiLl", "001111")
+_THOUSANDS = re.compile(r"\d{1,3}(?:,\d{3})+")
+# A unitless value is read in the table's unit only if it lies within this factor of the table's range;
+# "Glucose 5.4" is mmol/L, not a hypoglycaemic 5.4 mg/dL.
+PLAUSIBLE_RANGE_FACTOR = 3.0
+
+
+@dataclass(frozen=True)
+class AnalyteSpec:
+    name: str
+    category: str
+    unit: str | None
+    low: float | None
+    high: float | None
+
+
+@dataclass(frozen=True)
+class LabValue:
+    analyte: str
+    category: str
+    value: float
+    unit: str | None
+    reference_low: float | None
+    reference_high: float | None
+    flag: str | None
+    comparator: str | None = None
+    secondary_value: float | None = None
+    start: int = 0
+    end: int = 0
+
+
+def fold(text: str) -> str:
+    return text.lower().translate(_FOLD_TABLE)
+
+
+def _char_class(char: str) -> str:
+    group = {char, *(other for other, folded in _CONFUSABLE.items() if folded == fold(char)), fold(char) or char}
+    if len(group) == 1:
+        return re.escape(char)
+    return "[" + "".join(re.escape(member) for member in sorted(group)) + "]"
+
+
+def _phrase_units(phrase: str) -> List[str]:
+    units = []
+    for char in phrase.strip():
+        if char in " -":
+            units.append(r"[\s\-]*")
+        elif char == "/":
+            units.append(r"\s*/\s*")
+        else:
+            units.append(_char_class(char))
+    return units
+
+
+def _alternation(phrases: Iterable[str]) -> str:
+    # Shared prefixes are factored into a trie so the engine tests each position against a handful of
+    # branches instead of every phrase. Children come before the optional end, so the longest phrase wins.
+    trie: Dict[str, Any] = {}
+    for phrase in phrases:
+        node = trie
+        for unit in _phrase_units(phrase):
+            node = node.setdefault(unit, {})
+        node[""] = {}
+    return _trie_pattern(trie)
+
+
+def _trie_pattern(node: Dict[str, Any]) -> str:
+    branches = [unit + _trie_pattern(child) for unit, child in node.items() if unit]
+    if not branches:
+        return ""
+    pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        return f"(?:{pattern})?"
+    return pattern
+
+
+def _parse_number(text: str) -> float:
+    text = text.translate(_DIGIT_TABLE)
+    if _THOUSANDS.fullmatch(text):
+        return float(text.replace(",", ""))
+    return float(text.replace(",", "."))
+
+
+# One compiled scan finds analyte names; a second, anchored pattern reads what follows each name, bounded
+# by the start of the next name. Every character is examined a constant number of times.
+class LabValueExtractor:
+    def __init__(self, analytes: Dict[str, AnalyteSpec], version: str = "") -> None:
+        self.version = version
+        self._by_alias: Dict[str, AnalyteSpec] = {}
+        for alias, spec in analytes.items():
+            existing = self._by_alias.setdefault(fold(alias), spec)
+            if existing is not spec:
+                raise ValueError(f"Lab alias {alias!r} is ambiguous between {existing.name} and {spec.name}.")
+        self._unit_by_key: Dict[str, str] = {}
+        for canonical, spellings in UNITS.items():
+            for spelling in [canonical, *spellings]:
+                existing_unit = self._unit_by_key.setdefault(fold(spelling), canonical)
+                if existing_unit != canonical:
+                    raise ValueError(f"Unit {spelling!r} is ambiguous between {existing_unit} and {canonical}.")
+
+        units = _alternation(spelling for spellings in UNITS.values() for spelling in spellings)
+        self._analyte_pattern = re.compile(
+            rf"(?<![a-z0-9])(?:{_alternation(analytes)})(?![a-z0-9])", re.IGNORECASE
+        )
+        self._value_pattern = re.compile(
+            # Separators and short qualifiers between the name and its value: "Glucose (fasting) .... 182".
+            r"[\s:=.\-–]*(?:[a-z(),/\s]{0,24}?[\s:=.\-–]*)?"
+            rf"(?P<comparator>[<>≤≥]=?)?\s*(?P<value>{_NUMBER})"
+            # The whole number or nothing: backtracking to "18" of "182" would dodge the date checks below.
+            rf"(?!{_DIGIT}|[.,]{_DIGIT})"
+            # Dates ("12/03/2024", "12.03.2024") and bare ranges are not results.
+            r"(?![.\-]\d)(?!\s*/\s*\d+\s*[/.\-]\s*\d)"
+            r"(?:\s*/\s*(?P<secondary>\d{1,3}))?"
+            rf"(?:\s*(?P<unit>{units})(?![a-z0-9]))?"
+            r"(?:\s*\*?(?P<flag>(?-i:HH|LL|H|L)|high|low)\*?(?![a-z]))?"
+            r"(?:[\s(\[]*(?:ref(?:erence)?\.?(?:\s*(?:range|interval))?\s*[:.]?\s*)?"
+            rf"(?:(?P<low>{_NUMBER})\s*(?:-|–|—|to)\s*(?P<high>{_NUMBER})|(?P<limit_op>[<>≤≥])=?\s*(?P<limit>{_NUMBER}))"
+            r"\s*[)\]]?)?"
+            rf"(?(unit)|(?:\s*(?P<unit_after>{units})(?![a-z0-9]))?)",
+            re.IGNORECASE,
+        )
+
+    @classmethod
+    def from_csv(cls, path: Path) -> "LabValueExtractor":
+        raw = path.read_bytes()
+        analytes: Dict[str, AnalyteSpec] = {}
+        for row in csv.DictReader(raw.decode("utf-8").splitlines()):
+            spec = AnalyteSpec(
+                name=row["analyte"],
+                category=row.get("category", ""),
+                unit=row.get("unit") or None,
+                low=float(row["low"]) if row.get("low") else None,
+                high=float(row["high"]) if row.get("high") else None,
+            )
+            for alias in [spec.name, *(row.get("aliases") or "").split("|")]:
+                if alias:
+                    analytes[alias.lower()] = spec
+        return cls(analytes, version=hashlib.sha256(raw).hexdigest()[:12])
+
+    def extract(self, text: str) -> List[LabValue]:
+        mentions = list(self._analyte_pattern.finditer(text))
+        values = []
+        for index, mention in enumerate(mentions):
+            end = mentions[index + 1].start() if index + 1 < len(mentions) else len(text)
+            match = self._value_pattern.match(text, mention.end(), end)
+            if match is None or not any(char.isdigit() for char in match["value"]):
+                continue
+            spec = self._by_alias[fold(mention.group())]
+            values.append(self._build(spec, mention.start(), match))
+        return values
+
+    def _build(self, spec: AnalyteSpec, start: int, match: re.Match) -> LabValue:
+        value = _parse_number(match["value"])
+        unit_text = match["unit"] or match["unit_after"]
+        unit = self._unit_by_key[fold(unit_text)] if unit_text else None
+
+        if match["low"] is not None:
+            low, high = _parse_number(match["low"]), _parse_number(match["high"])
+        elif match["limit"] is not None:
+            limit = _parse_number(match["limit"])
+            low, high = (None, limit) if match["limit_op"] in "<≤" else (limit, None)
+        elif unit == spec.unit or (unit is None and _plausible_in_table_unit(value, spec)):
+            # The table's adult range only applies when the value is (or very likely is) in the table's unit.
+            low, high = spec.low, spec.high
+        else:
+            low = high = None
+
+        flag = None
+        if low is not None and value < low:
+            flag = "low"
+        elif high is not None and value > high:
+            flag = "high"
+        elif low is not None or high is not None:
+            flag = "normal"
+        elif match["flag"]:
+            flag = "low" if match["flag"].upper().startswith("L") else "high"
+
+        return LabValue(
+            analyte=spec.name,
+            category=spec.category,
+            value=value,
+            unit=unit,
+            reference_low=low,
+            reference_high=high,
+            flag=flag,
+            comparator=match["comparator"],
+            secondary_value=float(match["secondary"]) if match["secondary"] else None,
+            start=start,
+            end=match.end(),
+        )
+
+
+def _plausible_in_table_unit(value: float, spec: AnalyteSpec) -> bool:
+    if spec.low is not None and value < spec.low / PLAUSIBLE_RANGE_FACTOR:
+        return False
+    return spec.high is None or value <= spec.high * PLAUSIBLE_RANGE_FACTOR
+
+
+@lru_cache(maxsize=1)
+def get_lab_extractor() -> LabValueExtractor:
+    path = get_settings().lab_analytes_path
+    return LabValueExtractor.from_csv(Path(path) if path else DEFAULT_ANALYTES_PATH)
+
+
+def extract_lab_values(text: str) -> List[LabValue]:
+    return get_lab_extractor().extract(text)
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import re
+from bisect import bisect_left, bisect_right
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from ..settings import get_settings
+
+
+DEFAULT_LEXICON_PATH = Path(__file__).resolve().parent / "data" / "medical_lexicon.csv"
+
+# NegEx-style cues: a term is negated when a pre-cue precedes it (or a post-cue follows it)
+# within the window, without a clause boundary in between.
+PRE_NEGATION_CUES = [
+    "no", "not", "denies", "denied", "without", "negative for", "free of", "absence of",
+    "no evidence of", "no signs of", "no history of", "ruled out", "rules out", "resolved",
+]
+POST_NEGATION_CUES = ["absent", "denied", "negative", "ruled out", "not present", "resolved"]
+CLAUSE_BREAKERS = ["but", "however", "although", "except", "aside from"]
+NEGATION_WINDOW = 5
+POST_NEGATION_WINDOW = 3
+
+# Words (with inner hyphens/apostrophes) plus the punctuation that ends a negation scope.
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*|[.;:!?\n]")
+_PUNCTUATION = set(".;:!?\n")
+
+_TERM, _PRE_CUE, _POST_CUE, _BREAKER = range(4)
+
+
+@dataclass(frozen=True)
+class LexiconEntry:
+    concept: str
+    category: str
+    insight: str
+
+
+@dataclass(frozen=True)
+class LexiconMatch:
+    entry: LexiconEntry
+    text: str
+    start: int
+    end: int
+    negated: bool
+
+
+def tokenize(text: str) -> List[Tuple[str, int, int]]:
+    return [(match.group(), match.start(), match.end()) for match in _TOKEN_PATTERN.finditer(text.lower())]
+
+
+# Aho-Corasick over word tokens rather than characters: matches always fall on word boundaries and
+# scanning stays linear in the text length regardless of how many phrases are loaded.
+class LexiconMatcher:
+    def __init__(self, phrases: Iterable[Tuple[str, LexiconEntry]], version: str = "") -> None:
+        self.version = version
+        self._goto: List[Dict[str, int]] = [{}]
+        # Per state: (phrase length in tokens, kind, entry) for every phrase ending there.
+        self._outputs: List[List[Tuple[int, int, LexiconEntry | None]]] = [[]]
+        self._fail: List[int] = [0]
+        self.size = 0
+        for phrase, entry in phrases:
+            self._add(phrase, _TERM, entry)
+        for cue in PRE_NEGATION_CUES:
+            self._add(cue, _PRE_CUE, None)
+        for cue in POST_NEGATION_CUES:
+            self._add(cue, _POST_CUE, None)
+        for breaker in CLAUSE_BREAKERS:
+            self._add(breaker, _BREAKER, None)
+        self._build_failure_links()
+
+    @classmethod
+    def from_csv(cls, path: Path) -> "LexiconMatcher":
+        raw = path.read_bytes()
+        reader = csv.DictReader(raw.decode("utf-8").splitlines())
+        phrases = []
+        for row in reader:
+            entry = LexiconEntry(concept=row["concept"], category=row.get("category", ""), insight=row.get("insight", ""))
+            phrases.append((entry.concept, entry))
+            phrases.extend((synonym, entry) for synonym in (row.get("synonyms") or "").split("|") if synonym)
+        return cls(phrases, version=hashlib.sha256(raw).hexdigest()[:12])
+
+    def _add(self, phrase: str, kind: int, entry: LexiconEntry | None) -> None:
+        tokens = [token for token, _, _ in tokenize(phrase)]
+        if not tokens:
+            return
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._outputs.append([])
+                self._fail.append(0)
+            state = next_state
+        self._outputs[state].append((len(tokens), kind, entry))
+        if kind == _TERM:
+            self.size += 1
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(token, 0)
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    def _scan(self, tokens: List[Tuple[str, int, int]]) -> List[Tuple[int, int, int, LexiconEntry | None]]:
+        hits = []
+        state = 0
+        for index, (token, _, _) in enumerate(tokens):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for length, kind, entry in self._outputs[state]:
+                hits.append((index - length + 1, index + 1, kind, entry))
+        return hits
+
+    def match(self, text: str) -> List[LexiconMatch]:
+        tokens = tokenize(text)
+        hits = self._scan(tokens)
+
+        # Leftmost-longest, non-overlapping: "blood pressure" wins over "pressure"-style sub-phrases.
+        hits.sort(key=lambda hit: (hit[0], -(hit[1] - hit[0])))
+        selected = []
+        covered_until = 0
+        for hit in hits:
+            # A phrase registered under several kinds (e.g. "ruled out" as pre- and post-cue) keeps all of them.
+            if hit[0] >= covered_until or (selected and hit[:2] == selected[-1][:2]):
+                selected.append(hit)
+                covered_until = hit[1]
+
+        # Tokens after which a negation scope ends, and where negation cues sit.
+        boundaries = [index for index, (token, _, _) in enumerate(tokens) if token in _PUNCTUATION]
+        boundaries.extend(start for start, _, kind, _ in selected if kind == _BREAKER)
+        boundaries.sort()
+        pre_cue_ends = [end for _, end, kind, _ in selected if kind == _PRE_CUE]
+        post_cue_starts = [start for start, _, kind, _ in selected if kind == _POST_CUE]
+
+        matches = []
+        for start, end, kind, entry in selected:
+            if kind != _TERM:
+                continue
+            negated = _is_negated(start, end, pre_cue_ends, post_cue_starts, boundaries)
+            matches.append(
+                LexiconMatch(
+                    entry=entry,
+                    text=text[tokens[start][1]:tokens[end - 1][2]],
+                    start=tokens[start][1],
+                    end=tokens[end - 1][2],
+                    negated=negated,
+                )
+            )
+        return matches
+
+    def concepts(self, text: str) -> List[str]:
+        seen: Dict[str, None] = {}
+        for match in self.match(text):
+            if not match.negated:
+                seen.setdefault(match.entry.concept)
+        return list(seen)
+
+
+def _is_negated(
+    start: int, end: int, pre_cue_ends: List[int], post_cue_starts: List[int], boundaries: List[int]
+) -> bool:
+    # All lists are sorted token indices, so each check is a couple of binary searches.
+    position = bisect_right(pre_cue_ends, start)
+    if position:
+        cue_end = pre_cue_ends[position - 1]
+        if start - cue_end <= NEGATION_WINDOW and not _crosses(boundaries, cue_end, start):
+            return True
+    position = bisect_left(post_cue_starts, end)
+    if position < len(post_cue_starts):
+        cue_start = post_cue_starts[position]
+        if cue_start - end <= POST_NEGATION_WINDOW and not _crosses(boundaries, end, cue_start):
+            return True
+    return False
+
+
+def _crosses(boundaries: List[int], first: int, last: int) -> bool:
+    position = bisect_left(boundaries, first)
+    return position < len(boundaries) and boundaries[position] < last
+
+
+@lru_cache(maxsize=1)
+def get_lexicon_matcher() -> LexiconMatcher:
+    path = get_settings().lexicon_path
+    return LexiconMatcher.from_csv(Path(path) if path else DEFAULT_LEXICON_PATH)
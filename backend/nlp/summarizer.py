@@ -0,0 +1,209 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+
+import httpx
+
+from ..settings import Settings
+
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = "Summarize this medical report in <=120 words and highlight key findings:\n\n{text}"
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    def reserve(self, max_wait: float) -> float | None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        if wait > max_wait:
+            return None
+        # Tokens may go negative: later callers queue behind earlier reservations.
+        self.tokens -= 1
+        return wait
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def release(self) -> None:
+        self._probing = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+
+
+class Summarizer:
+    def __init__(
+        self,
+        api_key: str | None,
+        model: str,
+        base_url: str | None,
+        timeout: float,
+        max_retries: int,
+        max_concurrency: int,
+        requests_per_second: float,
+        burst: int,
+        max_rate_wait: float,
+        breaker_failures: int,
+        breaker_reset_seconds: float,
+        cache_size: int,
+    ) -> None:
+        self.model = model
+        self.max_rate_wait = max_rate_wait
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._bucket = TokenBucket(requests_per_second, burst)
+        self.breaker = CircuitBreaker(breaker_failures, breaker_reset_seconds)
+        self._http_client: httpx.AsyncClient | None = None
+        self._client = None
+        # The openai package is large; it is only imported when a key is configured.
+        client_class = _openai_client_class() if api_key else None
+        if client_class is not None:
+            self._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+                timeout=timeout,
+            )
+            self._client = client_class(
+                api_key=api_key,
+                base_url=base_url,
+                timeout=timeout,
+                max_retries=max_retries,
+                http_client=self._http_client,
+            )
+
+    @property
+    def enabled(self) -> bool:
+        return self._client is not None
+
+    async def close(self) -> None:
+        if self._http_client:
+            await self._http_client.aclose()
+
+    async def summarize(self, text: str) -> str | None:
+        if not self.enabled or not text.strip():
+            return None
+
+        key = hashlib.sha256(f"{self.model}\0{text}".encode("utf-8")).hexdigest()
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        if not self.breaker.allow():
+            return None
+        # Every exit that records neither a success nor a failure (over budget, cancelled while waiting or
+        # in flight) hands a half-open probe slot back; otherwise the breaker would never close again.
+        recorded = False
+        try:
+            wait = self._bucket.reserve(self.max_rate_wait)
+            if wait is None:
+                return None
+            if wait:
+                await asyncio.sleep(wait)
+
+            try:
+                async with self._semaphore:
+                    response = await self._client.responses.create(
+                        model=self.model,
+                        input=SUMMARY_PROMPT.format(text=text),
+                        max_output_tokens=180,
+                    )
+            except Exception as exc:
+                self.breaker.record_failure()
+                recorded = True
+                logger.warning("OpenAI summary failed, falling back to spaCy: %s", exc)
+                return None
+
+            self.breaker.record_success()
+            recorded = True
+        finally:
+            if not recorded:
+                self.breaker.release()
+
+        summary = (getattr(response, "output_text", "") or "").strip()
+        if summary:
+            self._cache[key] = summary
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return summary or None
+
+
+summarizer: Summarizer | None = None
+
+
+def _openai_client_class():
+    try:
+        from openai import AsyncOpenAI
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+    return AsyncOpenAI
+
+
+def start_summarizer(settings: Settings) -> None:
+    global summarizer
+    summarizer = Summarizer(
+        api_key=settings.openai_api_key,
+        model=settings.openai_model,
+        base_url=settings.openai_base_url,
+        timeout=settings.llm_timeout_seconds,
+        max_retries=settings.llm_max_retries,
+        max_concurrency=settings.llm_max_concurrency,
+        requests_per_second=settings.llm_requests_per_second,
+        burst=settings.llm_burst,
+        max_rate_wait=settings.llm_max_rate_wait_seconds,
+        breaker_failures=settings.llm_breaker_failures,
+        breaker_reset_seconds=settings.llm_breaker_reset_seconds,
+        cache_size=settings.llm_summary_cache_size,
+    )
+
+
+async def stop_summarizer() -> None:
+    if summarizer:
+        await summarizer.close()
+
+
+def get_summarizer() -> Summarizer:
+    if summarizer is None:
+        raise RuntimeError("Summarizer not initialized. Ensure start_summarizer is called.")
+    return summarizer
@@ -0,0 +1,3 @@
+# Bump whenever extraction output changes so cached report results are recomputed. Kept here so the API
+# process can build cache keys without importing the OCR stack.
+OCR_VERSION = "4"
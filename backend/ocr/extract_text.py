@@ -1,45 +1,109 @@
+from __future__ import annotations
+
 import io
+import string
 from functools import lru_cache
-from typing import Literal
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Literal, Union
 
-import easyocr
-import fitz  # PyMuPDF
 import numpy as np
 from PIL import Image
 
+from .preprocess import PreprocessConfig, get_preprocess_config, preprocess_image
+
+if TYPE_CHECKING:
+    import easyocr
+    import fitz
+
 ContentType = Literal["application/pdf", "image/png", "image/jpeg"]
+# Either the raw bytes or a path on disk; paths keep large uploads out of memory and out of IPC.
+FileSource = Union[bytes, Path]
 
+OCR_DPI = 200
+MIN_TEXT_LAYER_CHARS = 20
+MIN_TEXT_LAYER_READABLE_RATIO = 0.9
+_READABLE_PUNCTUATION = set(string.punctuation) | {"°", "µ", "±", "–", "—", "·", "•"}
 
-def extract_text_from_file(file_content: bytes, content_type: ContentType) -> str:
+
+def extract_text_from_file(source: FileSource, content_type: ContentType) -> str:
     if content_type == "application/pdf":
-        return _extract_from_pdf(file_content)
+        return _extract_from_pdf(source)
     if content_type in {"image/png", "image/jpeg"}:
-        return _extract_from_image(file_content)
+        return _extract_from_image(source, content_type)
     raise ValueError("Unsupported content type for OCR.")
 
 
-def _extract_from_pdf(file_content: bytes) -> str:
-    texts = []
-    with fitz.open(stream=file_content, filetype="pdf") as doc:
+def read_pdf_text_layers(source: FileSource) -> List[str | None]:
+    pages: List[str | None] = []
+    with _open_pdf(source) as doc:
         for page in doc:
-            pix = page.get_pixmap(dpi=200)
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            texts.append(_perform_ocr(img))
-    return "\n".join(texts)
+            text = page.get_text()
+            pages.append(text.strip() if _is_usable_text_layer(text) else None)
+    return pages
+
+
+def ocr_pdf_pages(source: FileSource, page_numbers: List[int]) -> List[str]:
+    import fitz  # PyMuPDF
+
+    texts = []
+    config = get_preprocess_config("application/pdf")
+    with _open_pdf(source) as doc:
+        for page_number in page_numbers:
+            pix = doc[page_number].get_pixmap(dpi=OCR_DPI, colorspace=fitz.csRGB, alpha=False)
+            # View the pixmap buffer directly; only one rendered page is alive at a time.
+            array = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+            texts.append(_perform_ocr(array, config))
+            del array, pix
+    return texts
+
 
+def merge_pdf_pages(pages: List[str | None], page_numbers: List[int], ocr_texts: List[str]) -> str:
+    for page_number, text in zip(page_numbers, ocr_texts):
+        pages[page_number] = text
+    return "\n".join(text or "" for text in pages)
 
-def _extract_from_image(file_content: bytes) -> str:
-    img = Image.open(io.BytesIO(file_content)).convert("RGB")
-    return _perform_ocr(img)
 
+def _extract_from_pdf(source: FileSource) -> str:
+    pages = read_pdf_text_layers(source)
+    missing = [index for index, text in enumerate(pages) if text is None]
+    ocr_texts = ocr_pdf_pages(source, missing) if missing else []
+    return merge_pdf_pages(pages, missing, ocr_texts)
 
-def _perform_ocr(image: Image.Image) -> str:
-    array = np.array(image)
+
+def _open_pdf(source: FileSource) -> fitz.Document:
+    import fitz  # PyMuPDF
+
+    if isinstance(source, bytes):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source, filetype="pdf")
+
+
+def _is_usable_text_layer(text: str) -> bool:
+    stripped = text.strip()
+    if len(stripped) < MIN_TEXT_LAYER_CHARS:
+        return False
+    readable = sum(1 for ch in stripped if ch.isalnum() or ch.isspace() or ch in _READABLE_PUNCTUATION)
+    return readable / len(stripped) >= MIN_TEXT_LAYER_READABLE_RATIO
+
+
+def _extract_from_image(source: FileSource, content_type: ContentType) -> str:
+    with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as img:
+        array = np.asarray(img.convert("RGB"))
+    return _perform_ocr(array, get_preprocess_config(content_type))
+
+
+def _perform_ocr(array: np.ndarray, config: PreprocessConfig) -> str:
+    prepared = preprocess_image(array, config)
+    if prepared is None:
+        return ""
     reader = _get_reader()
-    result = reader.readtext(array, detail=0)
+    result = reader.readtext(prepared, detail=0)
     return "\n".join(result)
 
 
 @lru_cache(maxsize=1)
 def _get_reader() -> easyocr.Reader:
+    # easyocr pulls in torch; only OCR worker processes should pay for it.
+    import easyocr
+
     return easyocr.Reader(["en"], gpu=False)
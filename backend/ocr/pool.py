@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, Any, Callable, List
+
+from ..services.metrics import timed
+
+if TYPE_CHECKING:
+    from .extract_text import ContentType, FileSource
+
+
+logger = logging.getLogger(__name__)
+
+
+class OCRPoolSaturated(Exception):
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("OCR queue is full.")
+        self.retry_after = retry_after
+
+
+class OCRTimeout(Exception):
+    def __init__(self, timeout: float) -> None:
+        super().__init__(f"OCR did not finish within {timeout:g}s.")
+        self.timeout = timeout
+
+
+class OCRWorkerCrashed(Exception):
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("An OCR worker process died; the pool was restarted.")
+        self.retry_after = retry_after
+
+
+def _init_worker() -> None:
+    # One torch thread per process: the pool already spreads work across cores.
+    try:
+        import torch
+
+        torch.set_num_threads(1)
+    except ImportError:  # pragma: no cover - torch ships with easyocr
+        pass
+    from .extract_text import _get_reader
+
+    _get_reader()
+
+
+def _warm_worker() -> int:
+    import numpy as np
+
+    from .extract_text import _get_reader
+
+    _get_reader().readtext(np.full((32, 32, 3), 255, dtype=np.uint8), detail=0)
+    return os.getpid()
+
+
+class OCRPool:
+    def __init__(self, max_workers: int, queue_size: int, timeout: float, retry_after: int) -> None:
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.restarts = 0
+        self._executor: ProcessPoolExecutor | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.queue_size
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._executor = self._new_executor()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        # Every request on the broken executor lands here; only the first one replaces it.
+        if self._executor is not broken:
+            return
+        logger.error("An OCR worker process died; restarting the OCR pool")
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._new_executor()
+        self.restarts += 1
+
+    def shutdown(self) -> None:
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def warm(self) -> None:
+        # Spawn every worker up front so the first uploads don't pay for process start and model load.
+        await asyncio.gather(
+            *(asyncio.wrap_future(self._executor.submit(_warm_worker)) for _ in range(self.max_workers))
+        )
+
+    async def extract_text(self, source: FileSource, content_type: ContentType) -> str:
+        if self._executor is None:
+            raise RuntimeError("OCR pool not started. Ensure start_ocr_pool is called.")
+        if self.in_flight >= self.capacity:
+            raise OCRPoolSaturated(self.retry_after)
+
+        self.in_flight += 1
+        futures: List[Future] = []
+        try:
+            return await asyncio.wait_for(self._run(futures, source, content_type), timeout=self.timeout)
+        except asyncio.TimeoutError as exc:
+            raise OCRTimeout(self.timeout) from exc
+        finally:
+            self._release_when_done(futures)
+
+    async def _run(self, futures: List[Future], source: FileSource, content_type: ContentType) -> str:
+        # Workers do the extraction; this process only needs the functions to submit them.
+        from .extract_text import extract_text_from_file, merge_pdf_pages, ocr_pdf_pages, read_pdf_text_layers
+
+        if content_type != "application/pdf":
+            with timed("image_ocr"):
+                return await self._submit(futures, extract_text_from_file, source, content_type)
+
+        with timed("pdf_text_layer"):
+            pages = await self._submit(futures, read_pdf_text_layers, source)
+        missing = [index for index, text in enumerate(pages) if text is None]
+        if not missing:
+            return merge_pdf_pages(pages, [], [])
+
+        # One contiguous chunk of scanned pages per worker; each worker opens the PDF itself.
+        chunk_count = min(self.max_workers, len(missing))
+        chunk_size = -(-len(missing) // chunk_count)
+        chunks = [missing[start:start + chunk_size] for start in range(0, len(missing), chunk_size)]
+        with timed("pdf_ocr"):
+            results = await asyncio.gather(
+                *(self._submit(futures, ocr_pdf_pages, source, chunk) for chunk in chunks)
+            )
+        ocr_texts = [text for chunk_texts in results for text in chunk_texts]
+        return merge_pdf_pages(pages, [index for chunk in chunks for index in chunk], ocr_texts)
+
+    async def _submit(self, futures: List[Future], fn: Callable[..., Any], *args: Any) -> Any:
+        executor = self._executor
+        try:
+            future = executor.submit(fn, *args)
+            futures.append(future)
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool as exc:
+            # The file that killed the worker may do so again, so the request fails rather than retrying.
+            self._restart(executor)
+            raise OCRWorkerCrashed(self.retry_after) from exc
+
+    def _release_when_done(self, futures: List[Future]) -> None:
+        # A timed-out page keeps its worker busy, so its slot is only freed once the process is done with it.
+        pending = [future for future in futures if not future.cancel() and not future.done()]
+        if not pending:
+            self.in_flight -= 1
+            return
+
+        remaining = len(pending)
+
+        def _on_done(_: Future) -> None:
+            nonlocal remaining
+            remaining -= 1
+            if remaining == 0:
+                self.in_flight -= 1
+
+        for future in pending:
+            future.add_done_callback(lambda f: self._loop.call_soon_threadsafe(_on_done, f))
+
+
+ocr_pool: OCRPool | None = None
+
+
+def start_ocr_pool(max_workers: int | None, queue_size: int, timeout: float, retry_after: int) -> None:
+    global ocr_pool
+    ocr_pool = OCRPool(
+        max_workers=max_workers or os.cpu_count() or 1,
+        queue_size=queue_size,
+        timeout=timeout,
+        retry_after=retry_after,
+    )
+    ocr_pool.start()
+    logger.info("OCR pool started with %d workers, queue size %d", ocr_pool.max_workers, queue_size)
+
+
+def stop_ocr_pool() -> None:
+    if ocr_pool:
+        ocr_pool.shutdown()
+
+
+def get_ocr_pool() -> OCRPool:
+    if ocr_pool is None:
+        raise RuntimeError("OCR pool not initialized. Ensure start_ocr_pool is called.")
+    return ocr_pool
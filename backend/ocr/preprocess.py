@@ -0,0 +1,189 @@
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Dict, Tuple
+
+import numpy as np
+from PIL import Image
+
+from ..settings import get_settings
+
+
+@dataclass(frozen=True)
+class PreprocessConfig:
+    enabled: bool = True
+    # EasyOCR reads reliably down to roughly this line height (ink rows, in pixels); more is wasted work.
+    target_text_height: int = 28
+    max_pixels: int = 4_000_000
+    min_scale: float = 0.25
+    deskew: bool = True
+    max_skew_degrees: float = 5.0
+    skew_step_degrees: float = 0.25
+    crop: bool = True
+    crop_margin: int = 16
+    # Pages with less ink than this share of pixels are treated as blank and skip OCR entirely.
+    blank_ink_ratio: float = 0.001
+    # Otsu always splits a page in two; below this gap between the class means it has split paper noise.
+    min_ink_contrast: float = 40.0
+
+
+# PDF pages are rendered by us at a known DPI and are rarely rotated by more than a scanner's tolerance;
+# phone photos are the large, skewed inputs.
+PREPROCESS_PROFILES: Dict[str, PreprocessConfig] = {
+    "application/pdf": PreprocessConfig(max_skew_degrees=3.0),
+    "image/png": PreprocessConfig(),
+    "image/jpeg": PreprocessConfig(max_skew_degrees=8.0),
+}
+
+_ANALYSIS_MAX_PIXELS = 1_000_000
+_SKEW_SAMPLE_POINTS = 20_000
+_MIN_SKEW_DEGREES = 0.3
+
+
+@lru_cache(maxsize=None)
+def get_preprocess_config(content_type: str) -> PreprocessConfig:
+    settings = get_settings()
+    config = PREPROCESS_PROFILES.get(content_type, PreprocessConfig())
+    return replace(
+        config,
+        enabled=config.enabled and settings.ocr_preprocess,
+        target_text_height=settings.ocr_target_text_height,
+        max_pixels=settings.ocr_max_pixels,
+    )
+
+
+def preprocess_image(array: np.ndarray, config: PreprocessConfig) -> np.ndarray | None:
+    if not config.enabled:
+        return array
+
+    gray = to_grayscale(array)
+    if gray.size > config.max_pixels:
+        gray = _resize(gray, (config.max_pixels / gray.size) ** 0.5)
+
+    if config.crop:
+        top, bottom, left, right = paper_bounds(gray)
+        gray = gray[top:bottom, left:right]
+
+    mask = ink_mask(gray, config.min_ink_contrast)
+    if mask.mean() < config.blank_ink_ratio:
+        return None
+
+    if config.deskew:
+        angle = estimate_skew(mask, config.max_skew_degrees, config.skew_step_degrees)
+        if abs(angle) >= _MIN_SKEW_DEGREES:
+            gray = _rotate(gray, angle)
+            mask = ink_mask(gray, config.min_ink_contrast)
+
+    if config.crop:
+        top, bottom, left, right = content_bounds(mask, config.crop_margin)
+        gray, mask = gray[top:bottom, left:right], mask[top:bottom, left:right]
+
+    text_height = estimate_text_height(mask)
+    if text_height:
+        scale = max(config.min_scale, config.target_text_height / text_height)
+        if scale < 0.9:
+            gray = _resize(gray, scale)
+    return np.ascontiguousarray(gray)
+
+
+def to_grayscale(array: np.ndarray) -> np.ndarray:
+    if array.ndim == 2:
+        return array
+    return np.asarray(Image.fromarray(array[..., :3]).convert("L"))
+
+
+def ink_mask(gray: np.ndarray, min_contrast: float = 0.0) -> np.ndarray:
+    mask = gray < otsu_threshold(gray)
+    ink = np.count_nonzero(mask)
+    if not ink or ink == mask.size:
+        return mask
+    gray_sum = float(gray.sum(dtype=np.int64))
+    ink_sum = float(gray[mask].sum(dtype=np.int64))
+    contrast = (gray_sum - ink_sum) / (mask.size - ink) - ink_sum / ink
+    if contrast < min_contrast:
+        return np.zeros_like(mask)
+    return mask
+
+
+def otsu_threshold(gray: np.ndarray) -> int:
+    histogram = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = histogram.sum()
+    levels = np.arange(256)
+    weight_dark = np.cumsum(histogram)
+    weight_light = total - weight_dark
+    mean_dark = np.cumsum(histogram * levels)
+    mean_total = mean_dark[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (mean_total * weight_dark / total - mean_dark) ** 2 / (weight_dark * weight_light)
+    between = np.nan_to_num(between)
+    if not between.any():
+        return 128
+    return int(np.argmax(between)) + 1
+
+
+def paper_bounds(gray: np.ndarray) -> Tuple[int, int, int, int]:
+    # Photos often include the desk around the sheet; keep the rows and columns that are mostly paper.
+    light = gray >= otsu_threshold(gray)
+    rows = np.flatnonzero(light.mean(axis=1) > 0.5)
+    cols = np.flatnonzero(light.mean(axis=0) > 0.5)
+    if not rows.size or not cols.size:
+        return 0, gray.shape[0], 0, gray.shape[1]
+    return rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+
+
+def content_bounds(mask: np.ndarray, margin: int) -> Tuple[int, int, int, int]:
+    # Thin lines such as the shadow of a page edge do not count as content.
+    rows = np.flatnonzero(mask.mean(axis=1) > 0.005)
+    cols = np.flatnonzero(mask.mean(axis=0) > 0.005)
+    if not rows.size or not cols.size:
+        return 0, mask.shape[0], 0, mask.shape[1]
+    return (
+        max(0, rows[0] - margin),
+        min(mask.shape[0], rows[-1] + 1 + margin),
+        max(0, cols[0] - margin),
+        min(mask.shape[1], cols[-1] + 1 + margin),
+    )
+
+
+def estimate_text_height(mask: np.ndarray) -> int | None:
+    # Text lines show up as runs of rows containing ink in the horizontal projection profile.
+    row_ink = mask.mean(axis=1) > 0.002
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], row_ink.astype(np.int8), [0]))))
+    heights = edges[1::2] - edges[0::2]
+    heights = heights[(heights >= 4) & (heights < mask.shape[0] // 4)]
+    if not heights.size:
+        return None
+    return int(np.median(heights))
+
+
+def estimate_skew(mask: np.ndarray, max_degrees: float, step_degrees: float) -> float:
+    # Projection-profile search: at the right angle, ink collapses into sharp row peaks (max variance).
+    scale = min(1.0, (_ANALYSIS_MAX_PIXELS / mask.size) ** 0.5)
+    ys, xs = np.nonzero(mask)
+    if ys.size < 100:
+        return 0.0
+    if ys.size > _SKEW_SAMPLE_POINTS:
+        picked = np.random.default_rng(0).choice(ys.size, _SKEW_SAMPLE_POINTS, replace=False)
+        ys, xs = ys[picked], xs[picked]
+    ys = ys * scale
+    xs = xs * scale
+
+    best_angle, best_score = 0.0, -1.0
+    for angle in np.arange(-max_degrees, max_degrees + step_degrees / 2, step_degrees):
+        radians = np.deg2rad(angle)
+        projected = ys * np.cos(radians) - xs * np.sin(radians)
+        histogram = np.bincount((projected - projected.min()).astype(np.int64))
+        score = float(np.var(histogram))
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+    return best_angle
+
+
+def _rotate(gray: np.ndarray, degrees: float) -> np.ndarray:
+    image = Image.fromarray(gray).rotate(degrees, resample=Image.BILINEAR, expand=True, fillcolor=255)
+    return np.asarray(image)
+
+
+def _resize(gray: np.ndarray, scale: float) -> np.ndarray:
+    height, width = gray.shape
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return np.asarray(Image.fromarray(gray).resize(size, resample=Image.BOX if scale < 1 else Image.BILINEAR))
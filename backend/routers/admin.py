@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel
+
+from ..ml.predictor import ModelValidationError
+from ..models.user_model import User
+from ..routers.auth import get_admin_user
+from ..services.model_reloader import get_model_reloader
+
+
+router = APIRouter()
+
+
+class ModelReloadRequest(BaseModel):
+    version: str | None = None
+    publish: bool = True
+
+
+@router.get("/model")
+async def model_status(current_user: User = Depends(get_admin_user)):
+    return get_model_reloader().status()
+
+
+@router.post("/model/reload")
+async def reload_model(payload: ModelReloadRequest, current_user: User = Depends(get_admin_user)):
+    reloader = get_model_reloader()
+    try:
+        version = await reloader.reload(payload.version, publish=payload.publish and payload.version is not None)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    except ModelValidationError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+    return {"version": version, **reloader.status()}
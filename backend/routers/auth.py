@@ -1,3 +1,4 @@
+import uuid
 from datetime import datetime, timedelta
 from typing import Annotated
 
@@ -8,7 +9,9 @@ from pydantic import BaseModel, EmailStr
 
 from ..database import get_collection
 from ..models.user_model import User
-from ..security import hash_password, verify_password
+from ..security import JWT_ALGORITHM, get_jwt_key, hash_password_async, verify_password_async
+from ..services.principal_cache import principal_cache
+from ..services.token_versions import get_token_version_store
 from ..settings import get_settings
 
 
@@ -33,35 +36,62 @@ class Token(BaseModel):
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
-    settings = get_settings()
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=60))
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, settings.secret_key, algorithm="HS256")
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
+    return jwt.encode(to_encode, get_jwt_key(), algorithm=JWT_ALGORITHM)
+
+
+def create_user_token(user_data: dict) -> str:
+    # Everything handlers read from the principal travels in the token, so verifying it needs no lookup.
+    return create_access_token(
+        {
+            "sub": user_data["email"],
+            "uid": str(user_data["_id"]),
+            "created_at": user_data["created_at"],
+            "ver": user_data.get("token_version", 0),
+        }
+    )
 
 
 async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> User:
-    settings = get_settings()
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=["HS256"])
+        payload = jwt.decode(token, get_jwt_key(), algorithms=[JWT_ALGORITHM])
         email: str | None = payload.get("sub")
         if email is None:
             raise credentials_exception
     except JWTError as exc:  # pragma: no cover - defensive
         raise credentials_exception from exc
 
-    collection = get_collection("users")
-    user_data = await collection.find_one({"email": email})
-    if not user_data:
+    if "uid" in payload and "created_at" in payload:
+        # The claims were signed by us, so the model is built without re-validating them.
+        user = User.model_construct(id=payload["uid"], email=email, created_at=payload["created_at"])
+    else:
+        # Tokens issued before claims were embedded still resolve through the database.
+        user = principal_cache.get(email)
+        if user is None:
+            collection = get_collection("users")
+            user_data = await collection.find_one({"email": email})
+            if not user_data:
+                raise credentials_exception
+            user_data["_id"] = str(user_data["_id"])
+            user = User(**user_data)
+            principal_cache.set(email, user)
+
+    if not get_token_version_store().is_current(user.id, payload.get("ver", 0)):
         raise credentials_exception
-    
-    user_data["_id"] = str(user_data["_id"])
-    return User(**user_data)
+    return user
+
+
+async def get_admin_user(current_user: Annotated[User, Depends(get_current_user)]) -> User:
+    if current_user.email.lower() not in get_settings().admin_emails:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required.")
+    return current_user
 
 
 @router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
@@ -74,7 +104,7 @@ async def register_user(user: UserCreate):
     now = datetime.utcnow().isoformat()
     user_doc = {
         "email": user.email,
-        "password_hash": hash_password(user.password),
+        "password_hash": await hash_password_async(user.password),
         "created_at": now,
     }
     result = await collection.insert_one(user_doc)
@@ -86,13 +116,18 @@ async def register_user(user: UserCreate):
 async def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]):
     collection = get_collection("users")
     user_data = await collection.find_one({"email": form_data.username})
-    if not user_data or not verify_password(form_data.password, user_data["password_hash"]):
+    if not user_data or not await verify_password_async(form_data.password, user_data["password_hash"]):
         raise HTTPException(status_code=400, detail="Invalid credentials.")
 
-    access_token = create_access_token({"sub": user_data["email"]})
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {"access_token": create_user_token(user_data), "token_type": "bearer"}
 
 
 @router.get("/me", response_model=UserOut)
 async def read_users_me(current_user: Annotated[User, Depends(get_current_user)]):
     return UserOut(id=current_user.id, email=current_user.email, created_at=current_user.created_at)
+
+
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_all(current_user: Annotated[User, Depends(get_current_user)]):
+    await get_token_version_store().bump(current_user.id)
+    principal_cache.invalidate(current_user.email)
@@ -1,59 +1,351 @@
-from datetime import datetime
-from typing import List
+import asyncio
+import base64
+import binascii
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Literal
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from ..database import get_collection
-from ..ml.predictor import Predictor
-from ..models.report_model import MedicalReport
-from ..ocr.extract_text import extract_text_from_file
+from ..models.report_model import InsightAnalytics, MedicalReport, ReportPage, ReportSearchPage
+from ..ocr.pool import OCRPoolSaturated, OCRTimeout, OCRWorkerCrashed
 from ..routers.auth import get_current_user
-from ..nlp.interpret_text import interpret_text
+from ..services.bulk_ingest import (
+    BulkFileStatus,
+    BulkItem,
+    content_type_for,
+    expand_zip,
+    is_zip,
+    iter_bulk_ndjson,
+)
+from ..services.metrics import timed
+from ..services.report_jobs import ReportJobQueueFull, get_report_job_queue
+from ..services.report_pipeline import process_report, report_fields
+from ..services.storage import get_original_store, get_report_text_store, keep_original
+from ..services.uploads import UploadTooLarge, spool_upload
+from ..settings import get_settings
 from ..models.user_model import User
 
 
 router = APIRouter()
-predictor = Predictor()
+# Routes that run the OCR/NLP pipeline; mounted only on nodes that run the processing workers.
+processing_router = APIRouter()
 
+# Everything the list view needs; extracted_text stays behind GET /{report_id}.
+SUMMARY_PROJECTION = {
+    "_id": 1,
+    "report_name": 1,
+    "ai_summary": 1,
+    "insights": 1,
+    "created_at": 1,
+    "status": 1,
+}
 
-@router.post("/upload")
+# Length of the ISO created_at prefix that identifies each bucket.
+INSIGHT_INTERVALS = {"day": 10, "month": 7}
+
+
+@processing_router.post("/upload")
 async def upload_report(
     report_file: UploadFile = File(...),
+    background: bool = Query(False, description="Return a job id immediately and process the report asynchronously."),
     current_user: User = Depends(get_current_user),
 ):
     if report_file.content_type not in {"application/pdf", "image/png", "image/jpeg"}:
         raise HTTPException(status_code=400, detail="Unsupported file type.")
 
-    content = await report_file.read()
+    settings = get_settings()
     try:
-        extracted_text = extract_text_from_file(content, report_file.content_type) if content else ""
+        with timed("spool_upload"):
+            upload = await spool_upload(report_file, settings.max_upload_bytes, settings.upload_spool_dir)
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc)) from exc
+    report_name = report_file.filename or "Medical Report"
+
+    if background:
+        try:
+            job_id = await get_report_job_queue().submit(
+                str(current_user.id), report_name, upload, report_file.content_type
+            )
+        except ReportJobQueueFull as exc:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many reports are waiting to be processed. Please retry shortly.",
+                headers={"Retry-After": str(settings.ocr_retry_after_seconds)},
+            ) from exc
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"job_id": job_id, "status": "pending"},
+        )
+
+    try:
+        results, _ = await asyncio.gather(
+            process_report(upload, report_file.content_type),
+            keep_original(upload, report_file.content_type),
+        )
+    except OCRPoolSaturated as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="OCR workers are busy. Please retry shortly.",
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
+    except OCRTimeout as exc:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(exc)) from exc
+    except OCRWorkerCrashed as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
     except Exception as exc:  # pragma: no cover - depends on OCR libs
         raise HTTPException(status_code=500, detail=f"OCR processing failed: {exc}") from exc
+    finally:
+        upload.discard()
 
-    nlp_result = interpret_text(extracted_text)
-    insights = predictor.predict(extracted_text, nlp_result.key_terms)
-
+    report_id = ObjectId()
     report_doc = {
+        "_id": report_id,
         "user_id": str(current_user.id),
-        "report_name": report_file.filename or "Medical Report",
-        "extracted_text": extracted_text,
-        "ai_summary": nlp_result.summary,
-        "insights": insights,
+        "report_name": report_name,
+        **report_fields(results),
         "created_at": datetime.utcnow().isoformat(),
+        "source_sha256": upload.sha256,
+        "source_content_type": report_file.content_type,
     }
 
     collection = get_collection("reports")
-    result = await collection.insert_one(report_doc)
-    report_doc["_id"] = str(result.inserted_id)
+    text_store = get_report_text_store()
+    with timed("mongo_insert"):
+        try:
+            await collection.insert_one(await text_store.prepare(report_id, report_doc))
+        except BaseException:
+            await text_store.discard_orphans([report_id])
+            raise
+    report_doc["_id"] = str(report_id)
     return MedicalReport(**report_doc)
 
 
-@router.get("/", response_model=List[MedicalReport])
-async def list_reports(current_user: User = Depends(get_current_user)):
+@processing_router.post("/bulk")
+async def bulk_upload(
+    files: List[UploadFile] = File(..., description="PDF/PNG/JPEG reports and/or zip archives of them."),
+    current_user: User = Depends(get_current_user),
+):
+    settings = get_settings()
+    items: List[BulkItem] = []
+    rejected: List[BulkFileStatus] = []
+    try:
+        for upload_file in files:
+            name = upload_file.filename or "Medical Report"
+            archive = is_zip(name, upload_file.content_type)
+            content_type = None if archive else content_type_for(name) or upload_file.content_type
+            if not archive and content_type not in {"application/pdf", "image/png", "image/jpeg"}:
+                rejected.append(BulkFileStatus(name, "failed", error="Unsupported file type."))
+                continue
+
+            max_bytes = settings.bulk_max_archive_bytes if archive else settings.max_upload_bytes
+            try:
+                upload = await spool_upload(upload_file, max_bytes, settings.upload_spool_dir)
+            except UploadTooLarge as exc:
+                rejected.append(BulkFileStatus(name, "failed", error=str(exc)))
+                continue
+
+            if archive:
+                try:
+                    expanded, expanded_rejected = await run_in_threadpool(
+                        expand_zip,
+                        upload,
+                        settings.max_upload_bytes,
+                        settings.bulk_max_files - len(items),
+                        settings.upload_spool_dir,
+                    )
+                finally:
+                    upload.discard()
+                items.extend(expanded)
+                rejected.extend(expanded_rejected)
+            elif len(items) >= settings.bulk_max_files:
+                upload.discard()
+                rejected.append(BulkFileStatus(name, "failed", error="Batch file limit reached."))
+            else:
+                items.append(BulkItem(name, upload, content_type))
+    except BaseException:
+        for item in items:
+            item.upload.discard()
+        raise
+
+    # Per-file statuses stream back as NDJSON while the batch runs; the last line is the summary.
+    return StreamingResponse(
+        iter_bulk_ndjson(items, rejected, str(current_user.id), settings.bulk_batch_size),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=MedicalReport)
+async def get_report_job(job_id: str, current_user: User = Depends(get_current_user)):
+    return await _get_user_report(job_id, current_user, not_found="Job not found.")
+
+
+@router.get("/", response_model=ReportPage)
+async def list_reports(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="next_cursor from the previous page."),
+    current_user: User = Depends(get_current_user),
+):
+    query: Dict[str, Any] = {"user_id": current_user.id}
+    if cursor:
+        created_at, last_id = _decode_cursor(cursor)
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": last_id}},
+        ]
+
+    collection = get_collection("reports")
+    documents = (
+        collection.find(query, SUMMARY_PROJECTION)
+        .sort([("created_at", -1), ("_id", -1)])
+        .limit(limit + 1)
+    )
+    items = []
+    async for document in documents:
+        items.append(document)
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = _encode_cursor(items[-1]["created_at"], items[-1]["_id"])
+    for item in items:
+        item["_id"] = str(item["_id"])
+    # Summary documents are already JSON-shaped; skip per-row model validation.
+    return JSONResponse(content={"items": items, "next_cursor": next_cursor})
+
+
+@router.get("/search", response_model=ReportSearchPage)
+async def search_reports(
+    q: str = Query(..., min_length=1, max_length=200, description='Words, "quoted phrases" or -excluded words.'),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    current_user: User = Depends(get_current_user),
+):
+    # Served by the user_id-prefixed text index: stemmed matches on key terms, insights and OCR text.
+    collection = get_collection("reports")
+    documents = (
+        collection.find(
+            {"user_id": current_user.id, "$text": {"$search": q}},
+            {**SUMMARY_PROJECTION, "score": {"$meta": "textScore"}},
+        )
+        .sort([("score", {"$meta": "textScore"}), ("created_at", -1)])
+        .skip(offset)
+        .limit(limit + 1)
+    )
+    items = []
+    async for document in documents:
+        document["_id"] = str(document["_id"])
+        items.append(document)
+
+    next_offset = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_offset = offset + limit
+    return JSONResponse(content={"items": items, "next_offset": next_offset})
+
+
+@router.get("/analytics/insights", response_model=InsightAnalytics)
+async def insight_analytics(
+    interval: Literal["day", "month"] = Query("day"),
+    since: datetime | None = Query(None, description="Only count reports created at or after this time."),
+    current_user: User = Depends(get_current_user),
+):
+    match: Dict[str, Any] = {"user_id": current_user.id}
+    if since:
+        if since.tzinfo:
+            # created_at is stored as naive UTC.
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        match["created_at"] = {"$gte": since.isoformat()}
+
+    # Model insights read "Label: 51.43%"; counting by label groups them regardless of probability.
+    pipeline = [
+        {"$match": match},
+        {"$project": {"_id": 0, "period": {"$substrBytes": ["$created_at", 0, INSIGHT_INTERVALS[interval]]}, "insights": 1}},
+        {"$unwind": "$insights"},
+        {
+            "$group": {
+                "_id": {"period": "$period", "label": {"$arrayElemAt": [{"$split": ["$insights", ": "]}, 0]}},
+                "count": {"$sum": 1},
+            }
+        },
+        {"$sort": {"_id.period": 1, "count": -1}},
+    ]
+    buckets: Dict[str, Dict[str, int]] = {}
+    async for row in get_collection("reports").aggregate(pipeline):
+        buckets.setdefault(row["_id"]["period"], {})[row["_id"]["label"]] = row["count"]
+    return {
+        "interval": interval,
+        "buckets": [{"period": period, "counts": counts} for period, counts in buckets.items()],
+    }
+
+
+@router.get("/{report_id}", response_model=MedicalReport)
+async def get_report(report_id: str, current_user: User = Depends(get_current_user)):
+    return await _get_user_report(report_id, current_user, not_found="Report not found.")
+
+
+@processing_router.post("/{report_id}/reprocess", status_code=status.HTTP_202_ACCEPTED)
+async def reprocess_report(report_id: str, current_user: User = Depends(get_current_user)):
+    try:
+        object_id = ObjectId(report_id)
+    except InvalidId as exc:
+        raise HTTPException(status_code=404, detail="Report not found.") from exc
+
+    report = await get_collection("reports").find_one(
+        {"_id": object_id, "user_id": current_user.id},
+        {"source_sha256": 1, "source_content_type": 1, "status": 1},
+    )
+    if not report:
+        raise HTTPException(status_code=404, detail="Report not found.")
+    if report.get("status") in {"pending", "processing"}:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Report is already being processed.")
+
+    store = get_original_store()
+    content_type = report.get("source_content_type")
+    upload = await store.fetch(report["source_sha256"], get_settings().upload_spool_dir) if store and content_type else None
+    if upload is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="The original file was not kept for this report.")
+    try:
+        await get_report_job_queue().resubmit(object_id, upload, content_type)
+    except ReportJobQueueFull as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many reports are waiting to be processed. Please retry shortly.",
+            headers={"Retry-After": str(get_settings().ocr_retry_after_seconds)},
+        ) from exc
+    return {"job_id": report_id, "status": "pending"}
+
+
+async def _get_user_report(report_id: str, current_user: User, not_found: str) -> MedicalReport:
+    try:
+        object_id = ObjectId(report_id)
+    except InvalidId as exc:
+        raise HTTPException(status_code=404, detail=not_found) from exc
+
     collection = get_collection("reports")
-    cursor = collection.find({"user_id": current_user.id}).sort("created_at", -1)
-    reports = []
-    async for report in cursor:
-        report["_id"] = str(report["_id"])
-        reports.append(MedicalReport(**report))
-    return reports
+    report = await collection.find_one({"_id": object_id, "user_id": current_user.id}, {"search_terms": 0})
+    if not report:
+        raise HTTPException(status_code=404, detail=not_found)
+    report["extracted_text"] = await get_report_text_store().load(report)
+    report["_id"] = str(report["_id"])
+    return MedicalReport(**report)
+
+
+def _encode_cursor(created_at: str, report_id: ObjectId) -> str:
+    return base64.urlsafe_b64encode(f"{created_at}|{report_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[str, ObjectId]:
+    try:
+        created_at, report_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+        return created_at, ObjectId(report_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError, InvalidId) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor.") from exc
@@ -1,13 +1,32 @@
+from typing import List, Tuple
+
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 
-from ..ml.predictor import Predictor
+from ..ml.batcher import MicroBatcher
+from ..ml.predictor import get_predictor
 from ..routers.auth import get_current_user
+from ..services.metrics import batch_size, timed
 from ..models.user_model import User
+from ..settings import get_settings
 
 
 router = APIRouter()
-predictor = Predictor()
+settings = get_settings()
+
+
+def _predict_batch(symptoms: List[str]) -> List[Tuple[List[str], str]]:
+    batch_size.observe(len(symptoms), "symptoms")
+    with timed("symptom_prediction"):
+        predictions, model_version = get_predictor().predict_batch_versioned(symptoms)
+    return [(prediction, model_version) for prediction in predictions]
+
+
+batcher = MicroBatcher(
+    _predict_batch,
+    max_batch_size=settings.symptom_batch_size,
+    max_wait_ms=settings.symptom_batch_wait_ms,
+)
 
 
 class SymptomRequest(BaseModel):
@@ -20,5 +39,5 @@ async def check_symptoms(payload: SymptomRequest, current_user: User = Depends(g
     if not symptoms.strip():
         return {"possible_conditions": [], "message": "Please provide symptoms."}
 
-    predictions = predictor.predict_from_symptoms(symptoms)
-    return {"possible_conditions": predictions}
+    predictions, model_version = await batcher.submit(symptoms)
+    return {"possible_conditions": predictions, "model_version": model_version}
@@ -1,7 +1,22 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from jose import jwk
+from jose.backends.base import Key
 from passlib.context import CryptContext
 
+from .settings import get_settings
+
+
+JWT_ALGORITHM = "HS256"
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt releases the GIL, so a few threads keep login storms off the event loop without starving it.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=get_settings().password_hash_workers,
+    thread_name_prefix="password-hash",
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -10,3 +25,19 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, verify_password, plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, hash_password, password)
+
+
+@lru_cache(maxsize=1)
+def get_jwt_key() -> Key:
+    # Built once instead of on every encode/decode; python-jose otherwise re-parses the secret each call.
+    return jwk.construct(get_settings().secret_key, JWT_ALGORITHM)
@@ -0,0 +1,294 @@
+import argparse
+import asyncio
+import json
+import time
+import zipfile
+from collections import Counter
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from bson import ObjectId
+from fastapi.concurrency import run_in_threadpool
+from pymongo.errors import BulkWriteError
+
+from ..database import close_mongo_connection, connect_to_mongo, ensure_indexes, get_collection
+from ..ml.predictor import get_predictor
+from ..nlp.interpret_text import interpret_texts
+from ..ocr.pool import OCRPoolSaturated, get_ocr_pool, start_ocr_pool, stop_ocr_pool
+from ..settings import get_settings
+from .storage import get_report_text_store, keep_original
+from .uploads import StoredUpload, UploadTooLarge, spool_fileobj
+
+
+CONTENT_TYPES_BY_SUFFIX = {
+    ".pdf": "application/pdf",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+}
+ZIP_CONTENT_TYPES = {"application/zip", "application/x-zip-compressed"}
+
+
+@dataclass
+class BulkItem:
+    name: str
+    upload: StoredUpload
+    content_type: str
+
+
+@dataclass
+class BulkFileStatus:
+    name: str
+    status: str
+    report_id: str | None = None
+    error: str | None = None
+
+
+class BulkProgress:
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.counts: Counter[str] = Counter()
+
+    def record(self, file_status: BulkFileStatus) -> None:
+        self.counts[file_status.status] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "completed": self.counts["completed"],
+            "skipped": self.counts["skipped"],
+            "failed": self.counts["failed"],
+            "elapsed_seconds": round(elapsed, 3),
+            "files_per_second": round(self.counts["completed"] / elapsed, 3) if elapsed else 0.0,
+        }
+
+
+def content_type_for(name: str) -> str | None:
+    return CONTENT_TYPES_BY_SUFFIX.get(Path(name).suffix.lower())
+
+
+def is_zip(name: str, content_type: str | None) -> bool:
+    return content_type in ZIP_CONTENT_TYPES or Path(name).suffix.lower() == ".zip"
+
+
+def expand_zip(
+    archive: StoredUpload,
+    max_bytes: int,
+    max_files: int,
+    directory: str | None = None,
+) -> Tuple[List[BulkItem], List[BulkFileStatus]]:
+    items: List[BulkItem] = []
+    rejected: List[BulkFileStatus] = []
+    try:
+        with zipfile.ZipFile(archive.path) as zip_file:
+            for info in zip_file.infolist():
+                if info.is_dir():
+                    continue
+                content_type = content_type_for(info.filename)
+                if content_type is None:
+                    rejected.append(BulkFileStatus(info.filename, "failed", error="Unsupported file type."))
+                    continue
+                if len(items) >= max_files:
+                    rejected.append(BulkFileStatus(info.filename, "failed", error="Batch file limit reached."))
+                    continue
+                try:
+                    # spool_fileobj enforces the limit on decompressed bytes, whatever the header claims.
+                    with zip_file.open(info) as member:
+                        upload = spool_fileobj(member, max_bytes, directory)
+                except UploadTooLarge as exc:
+                    rejected.append(BulkFileStatus(info.filename, "failed", error=str(exc)))
+                    continue
+                items.append(BulkItem(info.filename, upload, content_type))
+    except zipfile.BadZipFile as exc:
+        rejected.append(BulkFileStatus(archive.path.name, "failed", error=f"Invalid zip archive: {exc}"))
+    except BaseException:
+        for item in items:
+            item.upload.discard()
+        raise
+    return items, rejected
+
+
+async def ingest_bulk(
+    items: List[BulkItem],
+    user_id: str,
+    batch_size: int,
+    ocr_concurrency: int | None = None,
+) -> AsyncIterator[BulkFileStatus]:
+    collection = get_collection("reports")
+    ocr_pool = get_ocr_pool()
+    # Stay below the pool's admission limit so interactive uploads still get OCR slots.
+    semaphore = asyncio.Semaphore(ocr_concurrency or ocr_pool.max_workers)
+    tasks: List[asyncio.Task] = []
+
+    async def run_ocr(item: BulkItem) -> Tuple[BulkItem, str | None, Exception | None]:
+        async with semaphore:
+            while True:
+                try:
+                    text = await ocr_pool.extract_text(item.upload.path, item.content_type) if item.upload.size else ""
+                    return item, text, None
+                except OCRPoolSaturated as exc:
+                    await asyncio.sleep(exc.retry_after)
+                except Exception as exc:
+                    return item, None, exc
+
+    try:
+        # Files whose content already produced a report for this user were finished by an earlier run.
+        finished = set()
+        hashes = [item.upload.sha256 for item in items]
+        async for document in collection.find(
+            {"user_id": user_id, "source_sha256": {"$in": hashes}},
+            {"source_sha256": 1},
+        ):
+            finished.add(document["source_sha256"])
+
+        pending: List[BulkItem] = []
+        for item in items:
+            if item.upload.sha256 in finished:
+                yield BulkFileStatus(item.name, "skipped", error="Already ingested.")
+                continue
+            finished.add(item.upload.sha256)
+            pending.append(item)
+
+        tasks = [asyncio.create_task(run_ocr(item)) for item in pending]
+        batch: List[Tuple[BulkItem, str]] = []
+        for next_result in asyncio.as_completed(tasks):
+            item, text, error = await next_result
+            if error is not None:
+                yield BulkFileStatus(item.name, "failed", error=f"OCR processing failed: {error}")
+                continue
+            batch.append((item, text))
+            if len(batch) >= batch_size:
+                for file_status in await _finish_batch(collection, batch, user_id):
+                    yield file_status
+                batch = []
+        if batch:
+            for file_status in await _finish_batch(collection, batch, user_id):
+                yield file_status
+    finally:
+        for task in tasks:
+            task.cancel()
+        for item in items:
+            item.upload.discard()
+
+
+async def _finish_batch(collection: Any, batch: List[Tuple[BulkItem, str]], user_id: str) -> List[BulkFileStatus]:
+    texts = [text for _, text in batch]
+    try:
+        nlp_results, *_ = await asyncio.gather(
+            run_in_threadpool(interpret_texts, texts),
+            *(keep_original(item.upload, item.content_type) for item, _ in batch),
+        )
+        insights, model_version = await run_in_threadpool(
+            get_predictor().predict_reports_versioned, texts, [result.key_terms for result in nlp_results]
+        )
+        now = datetime.utcnow().isoformat()
+        documents = [
+            {
+                "_id": ObjectId(),
+                "user_id": user_id,
+                "report_name": item.name,
+                "extracted_text": text,
+                "ai_summary": nlp_result.summary,
+                "key_terms": nlp_result.key_terms,
+                "lab_values": [asdict(lab_value) for lab_value in nlp_result.lab_values],
+                "insights": report_insights,
+                "model_version": model_version,
+                "created_at": now,
+                "source_sha256": item.upload.sha256,
+                "source_content_type": item.content_type,
+            }
+            for (item, text), nlp_result, report_insights in zip(batch, nlp_results, insights)
+        ]
+        # Ids are assigned up front so long texts land in their side collection before the report exists.
+        text_store = get_report_text_store()
+        report_ids = [document["_id"] for document in documents]
+        write_errors: Dict[int, str] = {}
+        try:
+            documents = await asyncio.gather(*(text_store.prepare(document["_id"], document) for document in documents))
+            await collection.insert_many(documents, ordered=False)
+        except BulkWriteError as exc:
+            # Unordered inserts carry on past a rejected document, so only the rejected ones failed.
+            write_errors = {
+                error["index"]: error.get("errmsg", "Insert failed.") for error in exc.details.get("writeErrors", [])
+            }
+            await text_store.discard_orphans([report_ids[index] for index in write_errors])
+        except BaseException:
+            await text_store.discard_orphans(report_ids)
+            raise
+    except Exception as exc:
+        return [BulkFileStatus(item.name, "failed", error=str(exc)) for item, _ in batch]
+    return [
+        BulkFileStatus(item.name, "failed", error=write_errors[index])
+        if index in write_errors
+        else BulkFileStatus(item.name, "completed", report_id=str(report_id))
+        for index, ((item, _), report_id) in enumerate(zip(batch, report_ids))
+    ]
+
+
+async def iter_bulk_ndjson(
+    items: List[BulkItem],
+    rejected: List[BulkFileStatus],
+    user_id: str,
+    batch_size: int,
+) -> AsyncIterator[str]:
+    progress = BulkProgress()
+    for file_status in rejected:
+        progress.record(file_status)
+        yield json.dumps(asdict(file_status)) + "\n"
+    async for file_status in ingest_bulk(items, user_id, batch_size):
+        progress.record(file_status)
+        yield json.dumps(asdict(file_status)) + "\n"
+    yield json.dumps({"summary": progress.summary()}) + "\n"
+
+
+async def ingest_directory(directory: Path, email: str, batch_size: int) -> Dict[str, Any]:
+    user = await get_collection("users").find_one({"email": email})
+    if not user:
+        raise SystemExit(f"No user with email {email}.")
+
+    paths = sorted(path for path in directory.rglob("*") if path.is_file() and content_type_for(path.name))
+    items = [
+        BulkItem(str(path.relative_to(directory)), await asyncio.to_thread(StoredUpload.from_path, path), content_type_for(path.name))
+        for path in paths
+    ]
+    progress = BulkProgress()
+    async for file_status in ingest_bulk(items, str(user["_id"]), batch_size):
+        progress.record(file_status)
+        print(json.dumps(asdict(file_status)), flush=True)
+    return progress.summary()
+
+
+async def _run_cli(args: argparse.Namespace) -> None:
+    settings = get_settings()
+    await connect_to_mongo()
+    await ensure_indexes()
+    start_ocr_pool(
+        max_workers=args.workers or settings.ocr_workers,
+        queue_size=settings.ocr_queue_size,
+        timeout=settings.ocr_timeout_seconds,
+        retry_after=settings.ocr_retry_after_seconds,
+    )
+    try:
+        summary = await ingest_directory(args.directory, args.email, args.batch_size)
+        print(json.dumps({"summary": summary}), flush=True)
+    finally:
+        stop_ocr_pool()
+        await close_mongo_connection()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingest every PDF/PNG/JPEG under a directory as reports for one user.")
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--email", required=True, help="Owner of the ingested reports.")
+    parser.add_argument("--batch-size", type=int, default=get_settings().bulk_batch_size)
+    parser.add_argument("--workers", type=int, default=None, help="OCR worker processes (defaults to OCR_WORKERS).")
+    args = parser.parse_args()
+    if not args.directory.is_dir():
+        raise SystemExit(f"{args.directory} is not a directory.")
+    asyncio.run(_run_cli(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict
+
+from fastapi.concurrency import run_in_threadpool
+
+from ..ml.predictor import get_predictor
+from ..nlp.interpret_text import get_interpreter
+from ..ocr.pool import get_ocr_pool
+
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+
+
+def _warm_predictor() -> None:
+    get_predictor().predict_batch(["warm-up: fatigue, elevated glucose"])
+
+
+def _warm_interpreter() -> None:
+    get_interpreter().warm()
+
+
+class ModelRegistry:
+    def __init__(self) -> None:
+        self.components: Dict[str, str] = {"predictor": PENDING, "interpreter": PENDING, "ocr": PENDING}
+        self._warmers: Dict[str, Callable[[], Awaitable[None]]] = {
+            "predictor": lambda: run_in_threadpool(_warm_predictor),
+            "interpreter": lambda: run_in_threadpool(_warm_interpreter),
+            "ocr": lambda: get_ocr_pool().warm(),
+        }
+        self._task: asyncio.Task | None = None
+
+    @property
+    def ready(self) -> bool:
+        return all(state == READY for state in self.components.values())
+
+    def start_warmup(self) -> None:
+        self._task = asyncio.create_task(self.warm())
+
+    async def warm(self) -> None:
+        for name, warmer in self._warmers.items():
+            try:
+                await warmer()
+            except Exception:
+                logger.exception("Warm-up of %s failed", name)
+                self.components[name] = FAILED
+            else:
+                self.components[name] = READY
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict
+
+from fastapi.concurrency import run_in_threadpool
+
+from ..ml.artifacts import current_version_name, set_current_version
+from ..ml.predictor import get_predictor
+
+
+logger = logging.getLogger(__name__)
+
+
+class ModelReloader:
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.last_error: str | None = None
+        self.last_reload_at: str | None = None
+        self._seen_pointer: str | None = None
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._seen_pointer = current_version_name()
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def reload(self, version: str | None = None, publish: bool = False) -> str:
+        async with self._lock:
+            try:
+                # Loading and the canary batch run off the event loop; requests keep using the old model meanwhile.
+                loaded = await run_in_threadpool(get_predictor().reload, version)
+            except Exception as exc:
+                self.last_error = str(exc)
+                raise
+            if publish:
+                # Other workers follow the pointer on their next poll.
+                await run_in_threadpool(set_current_version, loaded)
+                self._seen_pointer = loaded
+            self.last_error = None
+            self.last_reload_at = datetime.utcnow().isoformat()
+            logger.info("Predictor now serving model %s", loaded)
+            return loaded
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "version": get_predictor().version,
+            "current_pointer": current_version_name(),
+            "watch_interval_seconds": self.interval,
+            "last_reload_at": self.last_reload_at,
+            "last_error": self.last_error,
+        }
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            pointer = await run_in_threadpool(current_version_name)
+            if pointer is None or pointer == self._seen_pointer:
+                continue
+            # Remember the pointer even on failure so a bad artifact is not retried every poll.
+            self._seen_pointer = pointer
+            try:
+                await self.reload()
+            except Exception:
+                logger.exception("Rejected model version %s; still serving %s", pointer, get_predictor().version)
+
+
+model_reloader: ModelReloader | None = None
+
+
+def start_model_reloader(interval: float) -> None:
+    global model_reloader
+    model_reloader = ModelReloader(interval)
+    model_reloader.start()
+
+
+async def stop_model_reloader() -> None:
+    if model_reloader:
+        await model_reloader.stop()
+
+
+def get_model_reloader() -> ModelReloader:
+    if model_reloader is None:
+        raise RuntimeError("Model reloader not initialized. Ensure start_model_reloader is called.")
+    return model_reloader
@@ -0,0 +1,38 @@
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+from ..models.user_model import User
+from ..settings import get_settings
+
+
+class PrincipalCache:
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Tuple[float, User]] = OrderedDict()
+
+    def get(self, subject: str) -> User | None:
+        entry = self._entries.get(subject)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del self._entries[subject]
+            return None
+        return user
+
+    def set(self, subject: str, user: User) -> None:
+        self._entries[subject] = (time.monotonic() + self.ttl_seconds, user)
+        self._entries.move_to_end(subject)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, subject: str) -> None:
+        self._entries.pop(subject, None)
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=get_settings().principal_cache_ttl_seconds,
+    max_entries=get_settings().principal_cache_size,
+)
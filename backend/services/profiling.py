@@ -0,0 +1,73 @@
+import cProfile
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from fastapi import Request
+
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+
+
+class RequestProfiler:
+    def __init__(
+        self,
+        enabled: bool,
+        sample_rate: float,
+        directory: str,
+        max_files: int,
+        authorize: Callable[[Request], Awaitable[bool]],
+    ) -> None:
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.directory = Path(directory)
+        self.max_files = max(1, max_files)
+        # Only authorized callers may force a profile with the header; anyone else could fill the disk.
+        self.authorize = authorize
+        # cProfile hooks the whole interpreter thread, so only one request is profiled at a time.
+        self._lock = threading.Lock()
+
+    async def __call__(self, request: Request, call_next):
+        if not self.enabled:
+            return await call_next(request)
+        requested = request.headers.get(PROFILE_HEADER) == "1" and await self.authorize(request)
+        sampled = not requested and self.sample_rate > 0 and random.random() < self.sample_rate
+        if not (requested or sampled) or not self._lock.acquire(blocking=False):
+            return await call_next(request)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            try:
+                response = await call_next(request)
+            finally:
+                profiler.disable()
+            path = self._dump(profiler, request)
+        finally:
+            self._lock.release()
+        if requested:
+            response.headers["X-Profile-File"] = path.name
+        return response
+
+    def _dump(self, profiler: cProfile.Profile, request: Request) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^a-zA-Z0-9]+", "-", request.url.path).strip("-") or "root"
+        stamp = time.strftime("%Y%m%dT%H%M%S")
+        path = self.directory / f"{stamp}-{request.method.lower()}-{slug}-{uuid.uuid4().hex[:8]}.prof"
+        profiler.dump_stats(path)
+        logger.info("Wrote request profile %s", path)
+        self._prune()
+        return path
+
+    def _prune(self) -> None:
+        # Names start with a timestamp, so name order is age order.
+        dumps = sorted(self.directory.glob("*.prof"))
+        for stale in dumps[:-self.max_files]:
+            stale.unlink(missing_ok=True)
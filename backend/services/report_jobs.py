@@ -0,0 +1,209 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Set
+
+from bson import ObjectId
+
+from ..database import get_collection
+from ..ocr.pool import OCRPoolSaturated
+from .report_pipeline import process_report
+from .storage import get_report_text_store, keep_original
+from .uploads import StoredUpload
+
+
+logger = logging.getLogger(__name__)
+
+JOB_PENDING = "pending"
+JOB_PROCESSING = "processing"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+INTERRUPTED_ERROR = "Processing was interrupted by a server restart. Reprocess the report to try again."
+
+
+class ReportJobQueueFull(Exception):
+    pass
+
+
+@dataclass
+class ReportJob:
+    report_id: ObjectId
+    upload: StoredUpload
+    content_type: str
+
+
+class ReportJobQueue:
+    def __init__(
+        self,
+        workers: int,
+        queue_size: int,
+        lease_seconds: float = 60.0,
+        collection_getter: Callable[[], Any] = lambda: get_collection("reports"),
+    ) -> None:
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self._queue: asyncio.Queue[ReportJob] = asyncio.Queue(maxsize=queue_size)
+        self._collection_getter = collection_getter
+        self._tasks: List[asyncio.Task] = []
+        # Reports this process has queued or is processing; their leases are renewed until the job ends.
+        self._leased: Set[ObjectId] = set()
+        # Queue slots claimed by submits that are still writing their report document.
+        self._claimed = 0
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._lease_loop()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, user_id: str, report_name: str, upload: StoredUpload, content_type: str) -> str:
+        # The queue owns the spooled upload from here on and discards it once the job ends.
+        self._claim_slot(upload)
+        try:
+            report_doc = {
+                "user_id": user_id,
+                "report_name": report_name,
+                "extracted_text": "",
+                "ai_summary": "",
+                "key_terms": [],
+                "lab_values": [],
+                "insights": [],
+                "created_at": datetime.utcnow().isoformat(),
+                "status": JOB_PENDING,
+                "stage": None,
+                "source_sha256": upload.sha256,
+                "source_content_type": content_type,
+                "lease_expires_at": self._lease_expiry(),
+            }
+            result = await self._collection_getter().insert_one(report_doc)
+        except BaseException:
+            self._release_slot(upload)
+            raise
+        self._enqueue(ReportJob(result.inserted_id, upload, content_type))
+        return str(result.inserted_id)
+
+    async def resubmit(self, report_id: ObjectId, upload: StoredUpload, content_type: str) -> None:
+        # Re-runs the pipeline over a stored original, updating the existing report in place.
+        self._claim_slot(upload)
+        try:
+            await self._update(
+                report_id,
+                {"status": JOB_PENDING, "stage": None, "error": None, "lease_expires_at": self._lease_expiry()},
+            )
+        except BaseException:
+            self._release_slot(upload)
+            raise
+        self._enqueue(ReportJob(report_id, upload, content_type))
+
+    def _claim_slot(self, upload: StoredUpload) -> None:
+        # Claimed before the first await, so concurrent submits cannot all pass the check and overfill the queue.
+        if self._queue.maxsize and self._queue.qsize() + self._claimed >= self._queue.maxsize:
+            upload.discard()
+            raise ReportJobQueueFull()
+        self._claimed += 1
+
+    def _release_slot(self, upload: StoredUpload) -> None:
+        self._claimed -= 1
+        upload.discard()
+
+    def _enqueue(self, job: ReportJob) -> None:
+        self._claimed -= 1
+        self._leased.add(job.report_id)
+        self._queue.put_nowait(job)
+
+    def _lease_expiry(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+
+    async def recover_orphans(self) -> int:
+        # Jobs whose process died (restart, crash, deploy) stop having their lease renewed. Nothing can
+        # resume them, so they are failed and the user can reprocess them from the stored original.
+        result = await self._collection_getter().update_many(
+            {
+                "status": {"$in": [JOB_PENDING, JOB_PROCESSING]},
+                "$or": [{"lease_expires_at": {"$lt": datetime.utcnow()}}, {"lease_expires_at": None}],
+                "_id": {"$nin": list(self._leased)},
+            },
+            {"$set": {"status": JOB_FAILED, "stage": None, "error": INTERRUPTED_ERROR}},
+        )
+        if result.modified_count:
+            logger.warning("Marked %d interrupted report jobs as failed", result.modified_count)
+        return result.modified_count
+
+    async def _lease_loop(self) -> None:
+        while True:
+            try:
+                if self._leased:
+                    await self._collection_getter().update_many(
+                        {"_id": {"$in": list(self._leased)}}, {"$set": {"lease_expires_at": self._lease_expiry()}}
+                    )
+                await self.recover_orphans()
+            except Exception:
+                logger.exception("Report job lease renewal failed")
+            await asyncio.sleep(self.lease_seconds / 3)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._process(job)
+            except Exception as exc:
+                logger.exception("Report job %s failed", job.report_id)
+                try:
+                    await self._update(job.report_id, {"status": JOB_FAILED, "error": str(exc)})
+                except Exception:
+                    # The worker must outlive a failed write; the expired lease fails the job later instead.
+                    logger.exception("Could not mark report job %s as failed", job.report_id)
+            finally:
+                self._leased.discard(job.report_id)
+                job.upload.discard()
+                self._queue.task_done()
+
+    async def _process(self, job: ReportJob) -> None:
+        await self._update(job.report_id, {"status": JOB_PROCESSING})
+        await keep_original(job.upload, job.content_type)
+
+        async def on_stage(stage: str, fields: Dict[str, Any]) -> None:
+            await self._update(job.report_id, {"stage": stage, **fields})
+
+        while True:
+            try:
+                await process_report(job.upload, job.content_type, on_stage=on_stage)
+                break
+            except OCRPoolSaturated as exc:
+                # Interactive uploads compete for the same OCR pool; background jobs yield to them.
+                await asyncio.sleep(exc.retry_after)
+
+        await self._update(job.report_id, {"status": JOB_COMPLETED})
+
+    async def _update(self, report_id: ObjectId, fields: Dict[str, Any]) -> None:
+        fields = await get_report_text_store().prepare(report_id, fields)
+        await self._collection_getter().update_one({"_id": report_id}, {"$set": fields})
+
+
+report_job_queue: ReportJobQueue | None = None
+
+
+def start_report_jobs(workers: int, queue_size: int, lease_seconds: float) -> None:
+    global report_job_queue
+    report_job_queue = ReportJobQueue(workers=workers, queue_size=queue_size, lease_seconds=lease_seconds)
+    report_job_queue.start()
+
+
+async def stop_report_jobs() -> None:
+    if report_job_queue:
+        await report_job_queue.stop()
+
+
+def get_report_job_queue() -> ReportJobQueue:
+    if report_job_queue is None:
+        raise RuntimeError("Report job queue not initialized. Ensure start_report_jobs is called.")
+    return report_job_queue
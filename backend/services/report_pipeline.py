@@ -0,0 +1,104 @@
+import asyncio
+from dataclasses import asdict
+from typing import Any, Awaitable, Callable, Dict
+
+from fastapi.concurrency import run_in_threadpool
+
+from ..ml.predictor import get_predictor
+from ..nlp.interpret_text import NLP_VERSION, NLPResult, interpret_text
+from ..nlp.lab_values import get_lab_extractor
+from ..nlp.lexicon import get_lexicon_matcher
+from ..nlp.summarizer import get_summarizer
+from ..ocr import OCR_VERSION
+from ..ocr.pool import get_ocr_pool
+from .metrics import timed
+from .result_cache import ResultCache, get_result_cache
+from .uploads import StoredUpload
+
+
+StageCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+async def process_report(
+    upload: StoredUpload,
+    content_type: str,
+    on_stage: StageCallback | None = None,
+) -> Dict[str, Any]:
+    predictor = get_predictor()
+    cache = get_result_cache()
+    with timed("cache_lookup"):
+        cached = await cache.get(_cache_key(upload, content_type, predictor.version))
+    if cached is not None:
+        if on_stage:
+            await on_stage("cache", report_fields(cached))
+        return cached
+
+    with timed("ocr"):
+        extracted_text = await get_ocr_pool().extract_text(upload.path, content_type) if upload.size else ""
+    if on_stage:
+        await on_stage("ocr", {"extracted_text": extracted_text})
+
+    # The LLM round-trip overlaps with spaCy; its summary wins when it arrives.
+    nlp_result, llm_summary = await asyncio.gather(
+        _interpret(extracted_text),
+        _summarize(extracted_text),
+    )
+    summary = llm_summary or nlp_result.summary
+    lab_values = [asdict(lab_value) for lab_value in nlp_result.lab_values]
+    if on_stage:
+        await on_stage("nlp", {"ai_summary": summary, "key_terms": nlp_result.key_terms, "lab_values": lab_values})
+
+    with timed("prediction"):
+        predictions, model_version = await run_in_threadpool(
+            predictor.predict_reports_versioned, [extracted_text], [nlp_result.key_terms]
+        )
+    insights = predictions[0]
+    if on_stage:
+        await on_stage("prediction", {"insights": insights, "model_version": model_version})
+
+    results = {
+        "extracted_text": extracted_text,
+        "ai_summary": summary,
+        "key_terms": nlp_result.key_terms,
+        "entities": nlp_result.entities,
+        "lab_values": lab_values,
+        "insights": insights,
+        "model_version": model_version,
+    }
+    with timed("cache_store"):
+        # Keyed by the model that produced the insights, in case a reload landed mid-request.
+        await cache.set(_cache_key(upload, content_type, model_version), results)
+    return results
+
+
+def _cache_key(upload: StoredUpload, content_type: str, model_version: str) -> str:
+    return ResultCache.make_key(
+        upload.sha256,
+        content_type,
+        OCR_VERSION,
+        NLP_VERSION,
+        get_lexicon_matcher().version,
+        get_lab_extractor().version,
+        model_version,
+    )
+
+
+async def _interpret(text: str) -> NLPResult:
+    with timed("spacy"):
+        return await run_in_threadpool(interpret_text, text)
+
+
+async def _summarize(text: str) -> str | None:
+    with timed("llm"):
+        return await get_summarizer().summarize(text)
+
+
+def report_fields(results: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "extracted_text": results["extracted_text"],
+        "ai_summary": results["ai_summary"],
+        "key_terms": results.get("key_terms", []),
+        "lab_values": results.get("lab_values", []),
+        "insights": results["insights"],
+        "model_version": results.get("model_version"),
+    }
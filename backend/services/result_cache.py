@@ -0,0 +1,94 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Tuple
+
+from ..database import get_collection
+
+
+class ResultCache:
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: int,
+        collection_getter: Callable[[], Any] = lambda: get_collection("report_cache"),
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._collection_getter = collection_getter
+        # key -> (expires_at, results); memory entries expire with the stored copy they mirror.
+        self._entries: OrderedDict[str, Tuple[datetime, Dict[str, Any]]] = OrderedDict()
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(content_sha256: str, content_type: str, *versions: str) -> str:
+        return ":".join([content_sha256, content_type, *versions])
+
+    async def ensure_indexes(self) -> None:
+        await self._collection_getter().create_index("created_at", expireAfterSeconds=self.ttl_seconds)
+
+    async def get(self, key: str) -> Dict[str, Any] | None:
+        now = datetime.utcnow()
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, results = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return results
+            del self._entries[key]
+
+        # The TTL monitor only sweeps once a minute, so expiry is re-checked here.
+        cutoff = now - timedelta(seconds=self.ttl_seconds)
+        document = await self._collection_getter().find_one({"_id": key, "created_at": {"$gt": cutoff}})
+        if not document:
+            self.misses += 1
+            return None
+
+        self.store_hits += 1
+        results = document["results"]
+        self._remember(key, results, document["created_at"])
+        return results
+
+    async def set(self, key: str, results: Dict[str, Any]) -> None:
+        created_at = datetime.utcnow()
+        self._remember(key, results, created_at)
+        await self._collection_getter().replace_one(
+            {"_id": key},
+            {"_id": key, "results": results, "created_at": created_at},
+            upsert=True,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.store_hits + self.misses
+        hits = self.memory_hits + self.store_hits
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "memory_hits": self.memory_hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+        }
+
+    def _remember(self, key: str, results: Dict[str, Any], created_at: datetime) -> None:
+        self._entries[key] = (created_at + timedelta(seconds=self.ttl_seconds), results)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+result_cache: ResultCache | None = None
+
+
+async def start_result_cache(max_entries: int, ttl_seconds: int) -> None:
+    global result_cache
+    result_cache = ResultCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+    await result_cache.ensure_indexes()
+
+
+def get_result_cache() -> ResultCache:
+    if result_cache is None:
+        raise RuntimeError("Result cache not initialized. Ensure start_result_cache is called.")
+    return result_cache
@@ -0,0 +1,213 @@
+import logging
+import os
+import re
+import shutil
+import tempfile
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from bson import Binary, ObjectId
+from fastapi.concurrency import run_in_threadpool
+from gridfs.errors import NoFile
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from pymongo.errors import DuplicateKeyError
+
+from ..database import get_collection, get_database
+from ..settings import get_settings
+from .uploads import StoredUpload
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+logger = logging.getLogger(__name__)
+
+TEXT_COLLECTION = "report_texts"
+ORIGINALS_BUCKET = "originals"
+ZSTD_LEVEL = 6
+ZLIB_LEVEL = 6
+# Bounds the hot document: ~2k distinct words covers the vocabulary of even very long reports.
+MAX_SEARCH_TERMS = 2000
+_SEARCH_TERM = re.compile(r"[^\W\d_]{3,}")
+
+
+def compress_text(text: str) -> Tuple[str, bytes]:
+    data = text.encode("utf-8")
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return "zlib", zlib.compress(data, ZLIB_LEVEL)
+
+
+def search_terms(text: str, limit: int = MAX_SEARCH_TERMS) -> List[str]:
+    return list(dict.fromkeys(_SEARCH_TERM.findall(text.lower())))[:limit]
+
+
+def decompress_text(codec: str, data: bytes) -> str:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Report text is zstd-compressed but the zstandard package is not installed.")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    if codec == "zlib":
+        return zlib.decompress(data).decode("utf-8")
+    raise ValueError(f"Unknown text codec {codec!r}.")
+
+
+# Reports keep a short preview of their OCR text inline; the full text is compressed into a side collection
+# and only read when a single report is opened. The distinct words past the preview stay inline as
+# search_terms so the text index still reaches the whole report.
+class ReportTextStore:
+    def __init__(self, inline_chars: int) -> None:
+        self.inline_chars = inline_chars
+
+    async def prepare(self, report_id: ObjectId, fields: Dict[str, Any]) -> Dict[str, Any]:
+        text = fields.get("extracted_text")
+        if text is None:
+            return fields
+        if len(text) <= self.inline_chars:
+            return {**fields, "text_truncated": False, "search_terms": []}
+        codec, data = await run_in_threadpool(compress_text, text)
+        terms = await run_in_threadpool(search_terms, text[self.inline_chars:])
+        await get_collection(TEXT_COLLECTION).replace_one(
+            {"_id": report_id},
+            {"_id": report_id, "codec": codec, "data": Binary(data), "chars": len(text)},
+            upsert=True,
+        )
+        return {
+            **fields,
+            "extracted_text": text[:self.inline_chars],
+            "text_truncated": True,
+            "search_terms": terms,
+        }
+
+    async def discard_orphans(self, report_ids: List[ObjectId]) -> None:
+        # prepare() writes the side document first; drop the ones whose report insert then failed.
+        existing = {
+            document["_id"]
+            async for document in get_collection("reports").find({"_id": {"$in": report_ids}}, {"_id": 1})
+        }
+        orphans = [report_id for report_id in report_ids if report_id not in existing]
+        if orphans:
+            await get_collection(TEXT_COLLECTION).delete_many({"_id": {"$in": orphans}})
+
+    async def load(self, report: Dict[str, Any]) -> str:
+        if not report.get("text_truncated"):
+            return report.get("extracted_text", "")
+        stored = await get_collection(TEXT_COLLECTION).find_one({"_id": report["_id"]})
+        if stored is None:
+            logger.warning("Full text for report %s is missing; serving the inline preview", report["_id"])
+            return report.get("extracted_text", "")
+        return await run_in_threadpool(decompress_text, stored["codec"], bytes(stored["data"]))
+
+
+# Originals are content-addressed by SHA-256, so re-uploads of the same file (by any user) are stored once.
+# Each upload streams into its own GridFS file; the first to claim the hash in <bucket>.by_sha256 keeps it.
+# Uploading under the hash itself would let a losing concurrent upload abort and delete the winner's chunks.
+class GridFSOriginalStore:
+    def __init__(self, bucket_name: str = ORIGINALS_BUCKET) -> None:
+        self.bucket_name = bucket_name
+
+    def _bucket(self) -> AsyncIOMotorGridFSBucket:
+        return AsyncIOMotorGridFSBucket(get_database(), bucket_name=self.bucket_name)
+
+    def _by_sha256(self) -> Any:
+        return get_collection(f"{self.bucket_name}.by_sha256")
+
+    async def put(self, upload: StoredUpload, content_type: str) -> bool:
+        if await self._by_sha256().find_one({"_id": upload.sha256}, {"_id": 1}):
+            return False
+        with upload.path.open("rb") as source:
+            file_id = await self._bucket().upload_from_stream(
+                upload.sha256, source, metadata={"content_type": content_type, "sha256": upload.sha256}
+            )
+        try:
+            await self._by_sha256().insert_one({"_id": upload.sha256, "file_id": file_id})
+        except DuplicateKeyError:
+            # A concurrent upload of the same content claimed the hash first; this copy is redundant.
+            await self._bucket().delete(file_id)
+            return False
+        except BaseException:
+            await self._bucket().delete(file_id)
+            raise
+        return True
+
+    async def fetch(self, sha256: str, directory: str | None = None) -> StoredUpload | None:
+        entry = await self._by_sha256().find_one({"_id": sha256})
+        if entry is None:
+            return None
+        fd, name = tempfile.mkstemp(prefix="original-", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as destination:
+                await self._bucket().download_to_stream(entry["file_id"], destination)
+        except NoFile:
+            os.unlink(name)
+            return None
+        except BaseException:
+            os.unlink(name)
+            raise
+        path = Path(name)
+        return StoredUpload(path=path, size=path.stat().st_size, sha256=sha256)
+
+
+class FileSystemOriginalStore:
+    def __init__(self, directory: str) -> None:
+        self.directory = Path(directory)
+
+    def _path(self, sha256: str) -> Path:
+        return self.directory / sha256[:2] / sha256
+
+    async def put(self, upload: StoredUpload, content_type: str) -> bool:
+        return await run_in_threadpool(self._put, upload)
+
+    def _put(self, upload: StoredUpload) -> bool:
+        target = self._path(upload.sha256)
+        if target.exists():
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=target.parent, prefix=".partial-")
+        os.close(fd)
+        try:
+            shutil.copyfile(upload.path, temp_name)
+            os.replace(temp_name, target)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+        return True
+
+    async def fetch(self, sha256: str, directory: str | None = None) -> StoredUpload | None:
+        path = self._path(sha256)
+        if not path.exists():
+            return None
+        # Read in place; discard() must not delete the stored original.
+        return StoredUpload(path=path, size=path.stat().st_size, sha256=sha256, owned=False)
+
+
+@lru_cache(maxsize=1)
+def get_report_text_store() -> ReportTextStore:
+    return ReportTextStore(inline_chars=get_settings().inline_text_chars)
+
+
+@lru_cache(maxsize=1)
+def get_original_store() -> GridFSOriginalStore | FileSystemOriginalStore | None:
+    settings = get_settings()
+    if settings.original_store == "gridfs":
+        return GridFSOriginalStore()
+    if settings.original_store == "filesystem":
+        return FileSystemOriginalStore(settings.original_store_dir)
+    if settings.original_store == "none":
+        return None
+    raise ValueError(f"Unknown ORIGINAL_STORE {settings.original_store!r}; expected gridfs, filesystem or none.")
+
+
+async def keep_original(upload: StoredUpload, content_type: str) -> None:
+    store = get_original_store()
+    if store is None or not upload.size:
+        return
+    try:
+        await store.put(upload, content_type)
+    except Exception:
+        # Originals only enable reprocessing later; failing to keep one must not fail the upload.
+        logger.exception("Could not store original %s", upload.sha256)
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+from typing import Dict
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from ..database import get_collection
+
+
+logger = logging.getLogger(__name__)
+
+
+# Revoking a user's tokens bumps their token_version; tokens minted with an older version are rejected.
+# Only users who ever revoked are tracked, so the full map is small enough to hold in every worker.
+class TokenVersionStore:
+    def __init__(self, refresh_seconds: float) -> None:
+        self.refresh_seconds = refresh_seconds
+        self._versions: Dict[str, int] = {}
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        await self.refresh()
+        if self.refresh_seconds > 0:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def get(self, user_id: str) -> int:
+        return self._versions.get(user_id, 0)
+
+    def is_current(self, user_id: str, token_version: int) -> bool:
+        return token_version >= self._versions.get(user_id, 0)
+
+    async def refresh(self) -> None:
+        cursor = get_collection("users").find({"token_version": {"$gt": 0}}, {"token_version": 1})
+        versions = {str(doc["_id"]): doc["token_version"] async for doc in cursor}
+        # Swap the whole map so lookups never see a half-built one.
+        self._versions = versions
+
+    async def bump(self, user_id: str) -> int:
+        result = await get_collection("users").find_one_and_update(
+            {"_id": ObjectId(user_id)},
+            {"$inc": {"token_version": 1}},
+            projection={"token_version": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        version = result["token_version"] if result else self.get(user_id) + 1
+        # Effective in this worker at once; other workers pick it up on their next refresh.
+        self._versions = {**self._versions, user_id: version}
+        return version
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Token version refresh failed; keeping the previous snapshot")
+
+
+token_version_store: TokenVersionStore | None = None
+
+
+async def start_token_version_store(refresh_seconds: float) -> None:
+    global token_version_store
+    token_version_store = TokenVersionStore(refresh_seconds)
+    await token_version_store.start()
+
+
+async def stop_token_version_store() -> None:
+    if token_version_store:
+        await token_version_store.stop()
+
+
+def get_token_version_store() -> TokenVersionStore:
+    if token_version_store is None:
+        raise RuntimeError("Token version store not initialized. Ensure start_token_version_store is called.")
+    return token_version_store
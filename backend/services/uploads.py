@@ -0,0 +1,63 @@
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, max_bytes: int) -> None:
+        super().__init__(f"Upload exceeds the {max_bytes // (1024 * 1024)} MB limit.")
+        self.max_bytes = max_bytes
+
+
+@dataclass
+class StoredUpload:
+    path: Path
+    size: int
+    sha256: str
+    owned: bool = True
+
+    def discard(self) -> None:
+        if self.owned:
+            self.path.unlink(missing_ok=True)
+
+    @classmethod
+    def from_path(cls, path: Path) -> "StoredUpload":
+        # Wraps a file the caller owns (e.g. CLI input); discard() leaves it in place.
+        digest = hashlib.sha256()
+        with path.open("rb") as handle:
+            while chunk := handle.read(UPLOAD_CHUNK_SIZE):
+                digest.update(chunk)
+        return cls(path=path, size=path.stat().st_size, sha256=digest.hexdigest(), owned=False)
+
+
+async def spool_upload(upload: UploadFile, max_bytes: int, directory: str | None = None) -> StoredUpload:
+    # UploadFile is already spooled by Starlette; copying its file in one worker thread avoids a thread
+    # hop per chunk.
+    return await run_in_threadpool(spool_fileobj, upload.file, max_bytes, directory)
+
+
+def spool_fileobj(fileobj: BinaryIO, max_bytes: int, directory: str | None = None) -> StoredUpload:
+    digest = hashlib.sha256()
+    size = 0
+    fd, name = tempfile.mkstemp(prefix="report-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            while chunk := fileobj.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                digest.update(chunk)
+                handle.write(chunk)
+    except BaseException:
+        os.unlink(name)
+        raise
+    return StoredUpload(path=Path(name), size=size, sha256=digest.hexdigest())
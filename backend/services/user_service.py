@@ -1,7 +1,9 @@
 from datetime import datetime
 
 from ..database import get_collection
-from ..security import hash_password, verify_password
+from ..security import hash_password_async, verify_password_async
+from .principal_cache import principal_cache
+from .token_versions import get_token_version_store
 from ..settings import get_settings
 
 
@@ -12,19 +14,21 @@ async def ensure_default_user() -> None:
 
     collection = get_collection("users")
     existing = await collection.find_one({"email": settings.default_user_email})
-    hashed_password = hash_password(settings.default_user_password)
 
     if existing:
-        if not verify_password(settings.default_user_password, existing.get("password_hash", "")):
+        # Only re-hash when the configured password no longer matches the stored hash.
+        if not await verify_password_async(settings.default_user_password, existing.get("password_hash", "")):
             await collection.update_one(
                 {"_id": existing["_id"]},
-                {"$set": {"password_hash": hashed_password}},
+                {"$set": {"password_hash": await hash_password_async(settings.default_user_password)}},
             )
+            principal_cache.invalidate(settings.default_user_email)
+            await get_token_version_store().bump(str(existing["_id"]))
         return
 
     user_doc = {
         "email": settings.default_user_email,
-        "password_hash": hashed_password,
+        "password_hash": await hash_password_async(settings.default_user_password),
         "created_at": datetime.utcnow().isoformat(),
     }
     await collection.insert_one(user_doc)
@@ -1,6 +1,6 @@
 from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import List, Literal
 
 from pydantic import EmailStr, Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -17,11 +17,66 @@ class Settings(BaseSettings):
 
     mongo_uri: str = Field(..., env="MONGO_URI")
     mongo_db_name: str = Field("medical_analyzer", env="MONGO_DB_NAME")
+    mongo_max_pool_size: int = Field(default=100, env="MONGO_MAX_POOL_SIZE")
+    mongo_min_pool_size: int = Field(default=0, env="MONGO_MIN_POOL_SIZE")
+    mongo_max_idle_time_ms: int | None = Field(default=None, env="MONGO_MAX_IDLE_TIME_MS")
+    mongo_connect_timeout_ms: int = Field(default=10_000, env="MONGO_CONNECT_TIMEOUT_MS")
+    mongo_server_selection_timeout_ms: int = Field(default=10_000, env="MONGO_SERVER_SELECTION_TIMEOUT_MS")
+    mongo_socket_timeout_ms: int | None = Field(default=None, env="MONGO_SOCKET_TIMEOUT_MS")
+    mongo_compressors: str | None = Field(default=None, env="MONGO_COMPRESSORS")
     openai_api_key: str | None = Field(default=None, env="OPENAI_API_KEY")
+    openai_model: str = Field(default="gpt-4o-mini", env="OPENAI_MODEL")
+    openai_base_url: str | None = Field(default=None, env="OPENAI_BASE_URL")
     secret_key: str = Field(..., env="SECRET_KEY")
     cors_origins: List[str] | str = Field(default="http://localhost:3000", env="CORS_ORIGINS")
     default_user_email: EmailStr | None = Field(default=None, env="DEFAULT_USER_EMAIL")
     default_user_password: str | None = Field(default=None, env="DEFAULT_USER_PASSWORD")
+    password_hash_workers: int = Field(default=4, env="PASSWORD_HASH_WORKERS")
+    principal_cache_ttl_seconds: float = Field(default=30.0, env="PRINCIPAL_CACHE_TTL_SECONDS")
+    principal_cache_size: int = Field(default=10_000, env="PRINCIPAL_CACHE_SIZE")
+    token_version_refresh_seconds: float = Field(default=15.0, env="TOKEN_VERSION_REFRESH_SECONDS")
+    ocr_workers: int | None = Field(default=None, env="OCR_WORKERS")
+    ocr_queue_size: int = Field(default=8, env="OCR_QUEUE_SIZE")
+    ocr_timeout_seconds: float = Field(default=120.0, env="OCR_TIMEOUT_SECONDS")
+    ocr_retry_after_seconds: int = Field(default=10, env="OCR_RETRY_AFTER_SECONDS")
+    ocr_preprocess: bool = Field(default=True, env="OCR_PREPROCESS")
+    ocr_target_text_height: int = Field(default=28, env="OCR_TARGET_TEXT_HEIGHT")
+    ocr_max_pixels: int = Field(default=4_000_000, env="OCR_MAX_PIXELS")
+    max_upload_bytes: int = Field(default=50 * 1024 * 1024, env="MAX_UPLOAD_BYTES")
+    upload_spool_dir: str | None = Field(default=None, env="UPLOAD_SPOOL_DIR")
+    original_store: str = Field(default="gridfs", env="ORIGINAL_STORE")
+    original_store_dir: str = Field(default="originals", env="ORIGINAL_STORE_DIR")
+    inline_text_chars: int = Field(default=4000, env="INLINE_TEXT_CHARS")
+    bulk_batch_size: int = Field(default=16, env="BULK_BATCH_SIZE")
+    bulk_max_files: int = Field(default=500, env="BULK_MAX_FILES")
+    bulk_max_archive_bytes: int = Field(default=1024 * 1024 * 1024, env="BULK_MAX_ARCHIVE_BYTES")
+    report_job_workers: int = Field(default=2, env="REPORT_JOB_WORKERS")
+    report_job_queue_size: int = Field(default=32, env="REPORT_JOB_QUEUE_SIZE")
+    report_job_lease_seconds: float = Field(default=60.0, env="REPORT_JOB_LEASE_SECONDS")
+    result_cache_size: int = Field(default=256, env="RESULT_CACHE_SIZE")
+    result_cache_ttl_seconds: int = Field(default=7 * 24 * 3600, env="RESULT_CACHE_TTL_SECONDS")
+    nlp_profile: str = Field(default="fast", env="NLP_PROFILE")
+    lexicon_path: str | None = Field(default=None, env="LEXICON_PATH")
+    lab_analytes_path: str | None = Field(default=None, env="LAB_ANALYTES_PATH")
+    llm_timeout_seconds: float = Field(default=20.0, env="LLM_TIMEOUT_SECONDS")
+    llm_max_retries: int = Field(default=1, env="LLM_MAX_RETRIES")
+    llm_max_concurrency: int = Field(default=4, env="LLM_MAX_CONCURRENCY")
+    llm_requests_per_second: float = Field(default=2.0, env="LLM_REQUESTS_PER_SECOND")
+    llm_burst: int = Field(default=4, env="LLM_BURST")
+    llm_max_rate_wait_seconds: float = Field(default=2.0, env="LLM_MAX_RATE_WAIT_SECONDS")
+    llm_breaker_failures: int = Field(default=5, env="LLM_BREAKER_FAILURES")
+    llm_breaker_reset_seconds: float = Field(default=60.0, env="LLM_BREAKER_RESET_SECONDS")
+    llm_summary_cache_size: int = Field(default=512, env="LLM_SUMMARY_CACHE_SIZE")
+    symptom_batch_size: int = Field(default=32, env="SYMPTOM_BATCH_SIZE")
+    symptom_batch_wait_ms: float = Field(default=5.0, env="SYMPTOM_BATCH_WAIT_MS")
+    model_reload_interval_seconds: float = Field(default=10.0, env="MODEL_RELOAD_INTERVAL_SECONDS")
+    admin_emails: List[str] | str | None = Field(default=None, env="ADMIN_EMAILS")
+    node_role: Literal["all", "api", "worker"] = Field(default="all", env="NODE_ROLE")
+    metrics_enabled: bool = Field(default=True, env="METRICS_ENABLED")
+    profiling_enabled: bool = Field(default=False, env="PROFILING_ENABLED")
+    profile_sample_rate: float = Field(default=0.0, env="PROFILE_SAMPLE_RATE")
+    profile_dir: str = Field(default="profiles", env="PROFILE_DIR")
+    profile_max_files: int = Field(default=50, env="PROFILE_MAX_FILES")
 
     @field_validator("cors_origins", mode="after")
     @classmethod
@@ -32,6 +87,15 @@ class Settings(BaseSettings):
             return [origin.strip() for origin in value.split(",") if origin.strip()]
         return value
 
+    @field_validator("admin_emails", mode="after")
+    @classmethod
+    def ensure_admin_list(cls, value: List[str] | str | None) -> List[str]:
+        if not value:
+            return []
+        if isinstance(value, str):
+            return [email.strip().lower() for email in value.split(",") if email.strip()]
+        return [email.lower() for email in value]
+
 
 @lru_cache
 def get_settings() -> Settings:
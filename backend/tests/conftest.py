@@ -0,0 +1,19 @@
+import os
+
+import pytest
+
+
+# Settings require these; tests never reach a real MongoDB or sign real tokens.
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+
+@pytest.fixture
+def mongo(monkeypatch):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    from backend import database
+
+    db = mongomock_motor.AsyncMongoMockClient()["test"]
+    monkeypatch.setattr(database, "database", db)
+    with mongomock_motor.enabled_gridfs_integration():
+        yield db
@@ -0,0 +1,56 @@
+import asyncio
+from types import SimpleNamespace
+
+from backend.services import bulk_ingest
+from backend.services.bulk_ingest import BulkItem, _finish_batch
+from backend.services.uploads import StoredUpload
+
+
+class FakePredictor:
+    def predict_reports_versioned(self, texts, key_terms):
+        return [[] for _ in texts], "test"
+
+
+async def keep_nothing(upload, content_type):
+    return None
+
+
+def interpret(texts):
+    return [SimpleNamespace(summary="", key_terms=[], lab_values=[]) for _ in texts]
+
+
+def make_item(tmp_path, name):
+    path = tmp_path / name
+    path.write_bytes(name.encode())
+    return BulkItem(name, StoredUpload(path=path, size=len(name), sha256=name, owned=False), "application/pdf")
+
+
+def test_partial_insert_failure_fails_only_rejected_files(tmp_path, mongo, monkeypatch):
+    monkeypatch.setattr(bulk_ingest, "interpret_texts", interpret)
+    monkeypatch.setattr(bulk_ingest, "get_predictor", FakePredictor)
+    monkeypatch.setattr(bulk_ingest, "keep_original", keep_nothing)
+    monkeypatch.setenv("INLINE_TEXT_CHARS", "10")
+    bulk_ingest.get_settings.cache_clear()
+    bulk_ingest.get_report_text_store.cache_clear()
+    reports = mongo["reports"]
+    batch = [(make_item(tmp_path, name), f"{name} glucose 182 mg/dL") for name in ("a.pdf", "b.pdf", "c.pdf")]
+
+    async def run():
+        # A unique index rejects b.pdf, standing in for any per-document write error.
+        await reports.create_index("report_name", unique=True)
+        await reports.insert_one({"report_name": "b.pdf"})
+        statuses = await _finish_batch(reports, batch, "user-1")
+        texts = await mongo["report_texts"].find().to_list(None)
+        return statuses, texts
+
+    try:
+        statuses, texts = asyncio.run(run())
+    finally:
+        bulk_ingest.get_settings.cache_clear()
+        bulk_ingest.get_report_text_store.cache_clear()
+
+    assert [status.status for status in statuses] == ["completed", "failed", "completed"]
+    assert "duplicate key" in statuses[1].error.lower()
+    assert sorted(str(text["_id"]) for text in texts) == sorted(
+        status.report_id for status in statuses if status.status == "completed"
+    )
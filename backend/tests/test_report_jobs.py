@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from backend.services import report_jobs
+from backend.services.report_jobs import JOB_COMPLETED, JOB_PENDING, ReportJobQueue, ReportJobQueueFull
+from backend.services.uploads import StoredUpload
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+def make_upload(tmp_path, name):
+    path = tmp_path / name
+    path.write_bytes(b"%PDF-1.4 report")
+    return StoredUpload(path=path, size=path.stat().st_size, sha256="0" * 64)
+
+
+async def fake_process_report(upload, content_type, on_stage):
+    await on_stage("ocr", {"extracted_text": "Glucose 182 mg/dL"})
+    await on_stage("nlp", {"ai_summary": "Glucose is high.", "key_terms": ["glucose"]})
+
+
+class YieldingInserts:
+    # A real insert suspends the caller; mongomock's does not, which would hide races around the await.
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+    async def insert_one(self, document):
+        await asyncio.sleep(0)
+        return await self._collection.insert_one(document)
+
+
+async def keep_nothing(upload, content_type):
+    return None
+
+
+@pytest.fixture
+def reports(monkeypatch):
+    monkeypatch.setattr(report_jobs, "process_report", fake_process_report)
+    monkeypatch.setattr(report_jobs, "keep_original", keep_nothing)
+    return mongomock_motor.AsyncMongoMockClient()["test"]["reports"]
+
+
+def test_submitted_job_runs_to_completion(tmp_path, reports):
+    upload = make_upload(tmp_path, "report.pdf")
+
+    async def run():
+        queue = ReportJobQueue(workers=1, queue_size=4, collection_getter=lambda: reports)
+        queue.start()
+        try:
+            job_id = await queue.submit("user-1", "report.pdf", upload, "application/pdf")
+            await asyncio.wait_for(queue._queue.join(), timeout=5)
+        finally:
+            await queue.stop()
+        return await reports.find_one({"_id": ObjectId(job_id)}), queue
+
+    document, queue = asyncio.run(run())
+
+    assert document["status"] == JOB_COMPLETED
+    assert document["stage"] == "nlp"
+    assert document["extracted_text"] == "Glucose 182 mg/dL"
+    assert document["key_terms"] == ["glucose"]
+    assert not queue._leased
+    assert not upload.path.exists()
+
+
+def test_concurrent_submits_beyond_capacity_are_rejected(tmp_path, reports):
+    uploads = [make_upload(tmp_path, f"report-{index}.pdf") for index in range(3)]
+
+    async def run():
+        # No workers: the queue only fills, so every submit past its capacity must be turned away.
+        collection = YieldingInserts(reports)
+        queue = ReportJobQueue(workers=0, queue_size=1, collection_getter=lambda: collection)
+        results = await asyncio.gather(
+            *(queue.submit("user-1", upload.path.name, upload, "application/pdf") for upload in uploads),
+            return_exceptions=True,
+        )
+        return results, queue, await reports.find().to_list(None)
+
+    results, queue, documents = asyncio.run(run())
+
+    accepted = [result for result in results if isinstance(result, str)]
+    assert len(accepted) == 1
+    assert sum(isinstance(result, ReportJobQueueFull) for result in results) == 2
+    assert [str(document["_id"]) for document in documents] == accepted
+    assert documents[0]["status"] == JOB_PENDING
+    assert queue.depth == 1
+    assert queue._leased == {documents[0]["_id"]}
+    assert [upload.path.exists() for upload in uploads] == [isinstance(result, str) for result in results]
+
+
+def test_failed_insert_releases_the_claimed_slot(tmp_path, reports):
+    class BrokenCollection:
+        async def insert_one(self, document):
+            raise RuntimeError("insert failed")
+
+    collections = [BrokenCollection(), reports]
+
+    async def run():
+        queue = ReportJobQueue(workers=0, queue_size=1, collection_getter=lambda: collections[0])
+        first = make_upload(tmp_path, "first.pdf")
+        with pytest.raises(RuntimeError):
+            await queue.submit("user-1", "first.pdf", first, "application/pdf")
+        collections.pop(0)
+        await queue.submit("user-1", "second.pdf", make_upload(tmp_path, "second.pdf"), "application/pdf")
+        return first, queue
+
+    first, queue = asyncio.run(run())
+
+    assert not first.path.exists()
+    assert queue.depth == 1
@@ -0,0 +1,52 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from backend.services import result_cache
+from backend.services.result_cache import ResultCache
+
+
+class Clock(datetime):
+    now_value = datetime(2024, 1, 1)
+
+    @classmethod
+    def utcnow(cls):
+        return cls.now_value
+
+
+def test_memory_entries_expire_with_the_ttl(mongo, monkeypatch):
+    monkeypatch.setattr(result_cache, "datetime", Clock)
+    monkeypatch.setattr(Clock, "now_value", datetime(2024, 1, 1))
+    cache = ResultCache(max_entries=8, ttl_seconds=60, collection_getter=lambda: mongo["report_cache"])
+
+    async def run():
+        await cache.set("key", {"summary": "cached"})
+        fresh = await cache.get("key")
+        Clock.now_value += timedelta(seconds=61)
+        return fresh, await cache.get("key")
+
+    fresh, expired = asyncio.run(run())
+
+    assert fresh == {"summary": "cached"}
+    assert expired is None
+    assert (cache.memory_hits, cache.misses) == (1, 1)
+    assert cache.stats()["entries"] == 0
+
+
+def test_store_hit_keeps_the_stored_expiry(mongo, monkeypatch):
+    monkeypatch.setattr(result_cache, "datetime", Clock)
+    monkeypatch.setattr(Clock, "now_value", datetime(2024, 1, 1))
+    collection = mongo["report_cache"]
+    cache = ResultCache(max_entries=8, ttl_seconds=60, collection_getter=lambda: collection)
+
+    async def run():
+        await collection.insert_one(
+            {"_id": "key", "results": {"summary": "stored"}, "created_at": Clock.now_value - timedelta(seconds=50)}
+        )
+        stored = await cache.get("key")
+        Clock.now_value += timedelta(seconds=20)
+        return stored, await cache.get("key")
+
+    stored, expired = asyncio.run(run())
+
+    assert stored == {"summary": "stored"}
+    assert expired is None
@@ -0,0 +1,59 @@
+import asyncio
+import hashlib
+
+from backend.services.storage import GridFSOriginalStore
+from backend.services.uploads import StoredUpload
+
+
+def make_upload(tmp_path, content):
+    path = tmp_path / "report.pdf"
+    path.write_bytes(content)
+    return StoredUpload(path=path, size=len(content), sha256=hashlib.sha256(content).hexdigest(), owned=False)
+
+
+class UncheckedStore(GridFSOriginalStore):
+    # Both uploads of a concurrent pair pass the existence check before either claims the hash.
+    def _by_sha256(self):
+        collection = super()._by_sha256()
+
+        class Unchecked:
+            def __getattr__(self, name):
+                return getattr(collection, name)
+
+            async def find_one(self, *args, **kwargs):
+                return None
+
+        return Unchecked()
+
+
+def test_duplicate_original_is_stored_once(tmp_path, mongo):
+    upload = make_upload(tmp_path, b"%PDF-1.4 " + bytes(range(256)) * 2048)
+
+    async def run():
+        store = GridFSOriginalStore()
+        stored = [await store.put(upload, "application/pdf") for _ in range(2)]
+        return stored, await mongo["originals.files"].count_documents({})
+
+    assert asyncio.run(run()) == ([True, False], 1)
+
+
+def test_losing_concurrent_upload_keeps_the_winner_intact(tmp_path, mongo):
+    content = b"%PDF-1.4 " + bytes(range(256)) * 2048
+    upload = make_upload(tmp_path, content)
+
+    async def run():
+        store = UncheckedStore()
+        stored = [await store.put(upload, "application/pdf") for _ in range(2)]
+        fetched = await GridFSOriginalStore().fetch(upload.sha256, str(tmp_path))
+        return stored, fetched, await mongo["originals.files"].count_documents({})
+
+    stored, fetched, files = asyncio.run(run())
+
+    assert stored == [True, False]
+    assert files == 1
+    assert fetched.path.read_bytes() == content
+    fetched.discard()
+
+
+def test_missing_original_fetches_nothing(tmp_path, mongo):
+    assert asyncio.run(GridFSOriginalStore().fetch("0" * 64, str(tmp_path))) is None
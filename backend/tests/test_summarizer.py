@@ -0,0 +1,166 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from backend.nlp.summarizer import Summarizer
+
+pytest.importorskip("openai")
+
+SUMMARY = "Fasting glucose is high; hemoglobin is normal."
+
+
+class FakeResponsesHandler(BaseHTTPRequestHandler):
+    # Answers POST /v1/responses the way the server's current mode says: "ok", "slow" or "error".
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.requests += 1
+        if self.server.mode == "slow":
+            time.sleep(self.server.delay)
+        if self.server.mode == "error":
+            self._send(500, {"error": {"message": "upstream unavailable", "type": "server_error"}})
+            return
+        self._send(
+            200,
+            {
+                "id": "resp_test",
+                "object": "response",
+                "created_at": 0,
+                "model": "test-model",
+                "status": "completed",
+                "output": [
+                    {
+                        "type": "message",
+                        "id": "msg_test",
+                        "role": "assistant",
+                        "status": "completed",
+                        "content": [{"type": "output_text", "text": SUMMARY, "annotations": []}],
+                    }
+                ],
+                "parallel_tool_calls": False,
+                "tool_choice": "auto",
+                "tools": [],
+            },
+        )
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (timeout or cancellation) before the reply.
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fake_openai():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeResponsesHandler)
+    server.daemon_threads = True
+    server.mode = "ok"
+    server.delay = 1.0
+    server.requests = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_summarizer(server, timeout=5.0, breaker_failures=5, breaker_reset_seconds=30.0):
+    return Summarizer(
+        api_key="test-key",
+        model="test-model",
+        base_url=f"http://127.0.0.1:{server.server_address[1]}/v1",
+        timeout=timeout,
+        max_retries=0,
+        max_concurrency=2,
+        requests_per_second=100.0,
+        burst=10,
+        max_rate_wait=1.0,
+        breaker_failures=breaker_failures,
+        breaker_reset_seconds=breaker_reset_seconds,
+        cache_size=8,
+    )
+
+
+def run_with(summarizer, scenario):
+    async def run():
+        try:
+            return await scenario(summarizer)
+        finally:
+            await summarizer.close()
+
+    return asyncio.run(run())
+
+
+def test_repeated_text_is_served_from_cache(fake_openai):
+    async def scenario(summarizer):
+        return [await summarizer.summarize("Glucose 182 mg/dL") for _ in range(2)]
+
+    assert run_with(make_summarizer(fake_openai), scenario) == [SUMMARY, SUMMARY]
+    assert fake_openai.requests == 1
+
+
+def test_timeout_falls_back_and_counts_as_failure(fake_openai):
+    fake_openai.mode = "slow"
+    summarizer = make_summarizer(fake_openai, timeout=0.2)
+
+    async def scenario(summarizer):
+        return await summarizer.summarize("Glucose 182 mg/dL")
+
+    assert run_with(summarizer, scenario) is None
+    assert summarizer.breaker.failures == 1
+
+
+def test_breaker_opens_then_recovers_through_a_half_open_probe(fake_openai):
+    fake_openai.mode = "error"
+    summarizer = make_summarizer(fake_openai, breaker_failures=2, breaker_reset_seconds=0.2)
+
+    async def scenario(summarizer):
+        assert await summarizer.summarize("report one") is None
+        assert await summarizer.summarize("report two") is None
+        assert summarizer.breaker.state == "open"
+        # While open, nothing reaches the upstream.
+        assert await summarizer.summarize("report three") is None
+        assert fake_openai.requests == 2
+
+        await asyncio.sleep(0.25)
+        assert summarizer.breaker.state == "half-open"
+        fake_openai.mode = "ok"
+        return await summarizer.summarize("report four")
+
+    assert run_with(summarizer, scenario) == SUMMARY
+    assert summarizer.breaker.state == "closed"
+    assert fake_openai.requests == 3
+
+
+def test_cancelled_probe_hands_the_half_open_slot_back(fake_openai):
+    fake_openai.mode = "error"
+    summarizer = make_summarizer(fake_openai, breaker_failures=1, breaker_reset_seconds=0.1)
+
+    async def scenario(summarizer):
+        assert await summarizer.summarize("report one") is None
+        await asyncio.sleep(0.15)
+        fake_openai.mode = "slow"
+        probe = asyncio.create_task(summarizer.summarize("report two"))
+        while fake_openai.requests < 2:
+            await asyncio.sleep(0.01)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        fake_openai.mode = "ok"
+        return await summarizer.summarize("report three")
+
+    assert run_with(summarizer, scenario) == SUMMARY
+    assert summarizer.breaker.state == "closed"
@@ -15,6 +15,8 @@ export default function Dashboard() {
   const [symptomInsights, setSymptomInsights] = useState([]);
   const [statusMessage, setStatusMessage] = useState("");
   const [uploading, setUploading] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     const token = typeof window !== "undefined" ? localStorage.getItem("access_token") : null;
@@ -26,8 +28,9 @@ export default function Dashboard() {
     const loadReports = async () => {
       try {
         const response = await api.get("/api/reports");
-        const items = response.data || [];
+        const items = response.data?.items || [];
         setReports(items);
+        setNextCursor(response.data?.next_cursor || null);
         setSelectedReport(items[0] || null);
       } catch (error) {
         console.warn("Failed to fetch reports", error);
@@ -37,6 +40,20 @@ export default function Dashboard() {
     loadReports();
   }, [router]);
 
+  const loadMoreReports = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const response = await api.get("/api/reports", { params: { cursor: nextCursor } });
+      setReports((prev) => [...prev, ...(response.data?.items || [])]);
+      setNextCursor(response.data?.next_cursor || null);
+    } catch (error) {
+      console.warn("Failed to fetch more reports", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleUpload = async (file) => {
     setUploading(true);
     setStatusMessage("");
@@ -140,7 +157,7 @@ export default function Dashboard() {
               <div className="grid md:grid-cols-2 gap-6">
                 {reports.map((report) => (
                   <button
-                    key={report.id}
+                    key={report._id}
                     onClick={() => setSelectedReport(report)}
                     className="glass gradient-border p-6 text-left space-y-3 transition hover:-translate-y-1"
                   >
@@ -155,6 +172,16 @@ export default function Dashboard() {
                   <p className="text-sm text-gray-500">No reports yet. Upload your first medical report to begin.</p>
                 )}
               </div>
+              {nextCursor && (
+                <button
+                  type="button"
+                  onClick={loadMoreReports}
+                  disabled={loadingMore}
+                  className="rounded-full border border-midnight px-6 py-2 text-sm font-medium text-midnight hover:bg-midnight hover:text-white disabled:opacity-50"
+                >
+                  {loadingMore ? "Loading…" : "Load more reports"}
+                </button>
+              )}
             </section>
           </main>
         </div>
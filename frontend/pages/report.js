@@ -9,6 +9,8 @@ export default function ReportsPage() {
   const router = useRouter();
   const [reports, setReports] = useState([]);
   const [selectedReport, setSelectedReport] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     const token = typeof window !== "undefined" ? localStorage.getItem("access_token") : null;
@@ -20,9 +22,12 @@ export default function ReportsPage() {
     const loadReports = async () => {
       try {
         const response = await api.get("/api/reports");
-        const items = response.data || [];
+        const items = response.data?.items || [];
         setReports(items);
-        setSelectedReport(items[0] || null);
+        setNextCursor(response.data?.next_cursor || null);
+        if (items[0]) {
+          selectReport(items[0]);
+        }
       } catch (error) {
         console.warn("Failed to load reports", error);
       }
@@ -31,6 +36,31 @@ export default function ReportsPage() {
     loadReports();
   }, [router]);
 
+  const loadMoreReports = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const response = await api.get("/api/reports", { params: { cursor: nextCursor } });
+      setReports((prev) => [...prev, ...(response.data?.items || [])]);
+      setNextCursor(response.data?.next_cursor || null);
+    } catch (error) {
+      console.warn("Failed to fetch more reports", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const selectReport = async (report) => {
+    setSelectedReport(report);
+    try {
+      // The list only carries summaries; fetch the full report for its extracted text.
+      const response = await api.get(`/api/reports/${report._id}`);
+      setSelectedReport(response.data);
+    } catch (error) {
+      console.warn("Failed to load report", error);
+    }
+  };
+
   return (
     <>
       <Head>
@@ -69,8 +99,8 @@ export default function ReportsPage() {
                 <div className="space-y-2">
                   {reports.map((report) => (
                     <button
-                      key={report.id}
-                      onClick={() => setSelectedReport(report)}
+                      key={report._id}
+                      onClick={() => selectReport(report)}
                       className="w-full rounded-2xl border border-transparent bg-white/70 px-4 py-3 text-left text-sm text-gray-600 hover:border-midnight"
                     >
                       <p className="font-medium text-midnight">{report.report_name}</p>
@@ -80,6 +110,16 @@ export default function ReportsPage() {
                   {reports.length === 0 && (
                     <p className="text-sm text-gray-500">No reports available yet.</p>
                   )}
+                  {nextCursor && (
+                    <button
+                      type="button"
+                      onClick={loadMoreReports}
+                      disabled={loadingMore}
+                      className="w-full rounded-full border border-midnight px-6 py-2 text-sm font-medium text-midnight hover:bg-midnight hover:text-white disabled:opacity-50"
+                    >
+                      {loadingMore ? "Loading…" : "Load more reports"}
+                    </button>
+                  )}
                 </div>
               </section>
             </aside>